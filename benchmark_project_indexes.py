@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Benchmark per-project queries on a project table with and without its indexes
+
+Fills a scratch SQLite database with a project_ext-shaped table, times the
+queries the importers and listings run for one project, then adds the
+indexes from project_table_indexes and times them again.
+
+Usage: python benchmark_project_indexes.py [rows] [projects] [database file]
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+
+# Import the package the same way the importers do
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import Column, Integer, MetaData, String, Table, create_engine, text
+
+from src.models import project_table_indexes
+
+TABLE = 'project_ext'
+
+QUERIES = {
+    'count one project': f"SELECT COUNT(*) FROM {TABLE} WHERE project_id = :project_id",
+    'first keyset page': f"SELECT * FROM {TABLE} WHERE project_id = :project_id ORDER BY project_id, id LIMIT 50",
+    'deep keyset page': f"SELECT * FROM {TABLE} WHERE project_id = :project_id AND id > :after ORDER BY project_id, id LIMIT 50",
+    'row fingerprints': f"SELECT id, row_hash FROM {TABLE} WHERE project_id = :project_id",
+    'catalog lookup': f"SELECT id FROM {TABLE} WHERE catalog_number = :catalog_number",
+}
+
+
+def build_table(engine, rows, projects, batch_size=50000):
+    """Create the table without secondary indexes and fill it with random rows"""
+    metadata = MetaData()
+    table = Table(
+        TABLE, metadata,
+        Column('id', Integer, primary_key=True),
+        Column('project_id', Integer, nullable=False),
+        Column('user_id', Integer, nullable=False),
+        Column('catalog_number', String(100)),
+        Column('description', String(200)),
+        Column('row_hash', String(32)),
+    )
+    metadata.create_all(engine)
+
+    random.seed(0)
+    with engine.begin() as connection:
+        for start in range(0, rows, batch_size):
+            batch = [
+                {
+                    'project_id': random.randint(1, projects),
+                    'user_id': 1,
+                    'catalog_number': f"CAT-{random.randint(0, rows):08d}",
+                    'description': f"Item {n}",
+                    'row_hash': f"{n:032x}",
+                }
+                for n in range(start, min(start + batch_size, rows))
+            ]
+            connection.execute(table.insert(), batch)
+    return table
+
+
+def time_queries(engine, params, repeat=5):
+    """Best-of-repeat latency in milliseconds for each query"""
+    timings = {}
+    with engine.connect() as connection:
+        for name, sql in QUERIES.items():
+            best = None
+            for _ in range(repeat):
+                start = time.perf_counter()
+                connection.execute(text(sql), params).fetchall()
+                elapsed = (time.perf_counter() - start) * 1000
+                best = elapsed if best is None else min(best, elapsed)
+            timings[name] = best
+    return timings
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 2_000_000
+    projects = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    path = sys.argv[3] if len(sys.argv) > 3 else os.path.join(tempfile.gettempdir(), 'benchmark_project_indexes.db')
+
+    if os.path.exists(path):
+        os.remove(path)
+    engine = create_engine(f"sqlite:///{path}")
+
+    print(f"Filling {TABLE} with {rows:,} rows across {projects} projects...")
+    start = time.perf_counter()
+    table = build_table(engine, rows, projects)
+    print(f"  done in {time.perf_counter() - start:.1f}s")
+
+    with engine.connect() as connection:
+        project_id = projects // 2
+        ids = connection.execute(
+            text(f"SELECT id FROM {TABLE} WHERE project_id = :project_id ORDER BY id"), {'project_id': project_id}
+        ).scalars().all()
+        catalog_number = connection.execute(text(f"SELECT catalog_number FROM {TABLE} LIMIT 1")).scalar()
+    params = {'project_id': project_id, 'after': ids[len(ids) // 2], 'catalog_number': catalog_number}
+
+    before = time_queries(engine, params)
+
+    print("Creating indexes...")
+    start = time.perf_counter()
+    # Attach the same index definitions the model declares, then create them
+    Table(TABLE, table.metadata, *project_table_indexes(TABLE, ['catalog_number']), extend_existing=True)
+    for index in table.indexes:
+        index.create(engine)
+    print(f"  done in {time.perf_counter() - start:.1f}s")
+
+    after = time_queries(engine, params)
+
+    print()
+    print(f"{'query':<20} {'before ms':>12} {'after ms':>12} {'speedup':>10}")
+    for name in QUERIES:
+        speedup = before[name] / after[name] if after[name] else float('inf')
+        print(f"{name:<20} {before[name]:>12.2f} {after[name]:>12.2f} {speedup:>9.0f}x")
+
+    engine.dispose()
+    os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,7 +3,6 @@
 Examine Excel file structure for import
 """
 
-import pandas as pd
 import sys
 import os
 from dotenv import load_dotenv
@@ -24,16 +23,18 @@ def examine_excel_file():
     print(f"File: {excel_file}")
     
     try:
-        # Read all sheets
-        excel_file_obj = pd.ExcelFile(excel_file)
-        print(f"\n📋 Sheets found: {excel_file_obj.sheet_names}")
+        from src.workbook import get_workbook
         
-        for sheet_name in excel_file_obj.sheet_names:
+        # Open the workbook once and parse each sheet from it
+        workbook = get_workbook(excel_file)
+        print(f"\n📋 Sheets found: {workbook.sheet_names}")
+        
+        for sheet_name in workbook.sheet_names:
             print(f"\n📊 Sheet: {sheet_name}")
             print("-" * 30)
             
             # Read the sheet
-            df = pd.read_excel(excel_file, sheet_name=sheet_name)
+            df = workbook.sheet(sheet_name)
             
             print(f"Shape: {df.shape} (rows, columns)")
             print(f"Columns: {list(df.columns)}")
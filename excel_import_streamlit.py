@@ -18,11 +18,28 @@ import re
 sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
 load_dotenv()
 
+# Reserved keywords that are renamed with an 'excel_' prefix
+RESERVED_KEYWORDS = frozenset({
+    'id', 'project_id', 'user_id', 'created_at', 'updated_at',
+    'total', 'sum', 'count', 'avg', 'min', 'max', 'select', 'from', 'where',
+    'order', 'group', 'by', 'having', 'join', 'left', 'right', 'inner',
+    'outer', 'on', 'as', 'and', 'or', 'not', 'null', 'true', 'false',
+    'index', 'key', 'primary', 'foreign', 'unique', 'check', 'default',
+    'constraint', 'table', 'database', 'schema', 'view', 'procedure',
+    'function', 'trigger', 'sequence', 'user', 'password', 'grant',
+    'revoke', 'commit', 'rollback', 'transaction', 'lock', 'deadlock'
+})
+
+# Example rows kept per error reason in the import error table
+MAX_ERROR_EXAMPLES = 5
+
+NON_ALNUM_RE = re.compile(r'[^a-zA-Z0-9]')
+UNDERSCORES_RE = re.compile(r'_+')
+
 def clean_dataframe(df):
-    """Clean dataframe by removing empty rows and handling NaN values"""
-    df = df.dropna(how='all')
-    df = df.replace({np.nan: None})
-    return df
+    """Clean dataframe by removing empty rows, keeping native column dtypes"""
+    from src.ingest import clean_frame
+    return clean_frame(df)
 
 def get_table_mapping(sheet_name):
     """Get the database table name for a given sheet name"""
@@ -51,224 +68,323 @@ def extract_project_name(filename):
     
     return project_name
 
-def create_dynamic_table_model(table_name, columns):
-    """Dynamically create a SQLAlchemy model for a table"""
-    from sqlalchemy import Column, Integer, String, DateTime, Text, Boolean, Float, ForeignKey, MetaData, Table
-    from sqlalchemy.ext.declarative import declarative_base
+def create_dynamic_table_model(table_name, columns, kinds=None, names=None):
+    """
+    Dynamically create a SQLAlchemy model for a table
+    
+    kinds maps headers to inferred converter kinds (src.inference); columns
+    without one are created as Text. names maps headers to the column
+    name to use instead of their cleaned name.
+    """
+    from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Table
     from sqlalchemy.sql import func
+    from src.table_cache import get_metadata
+    from src.models import LOOKUP_COLUMNS, project_table_indexes
+    from src.inference import sql_type
+    from src.ingest import STRING
     
-    # Create a new metadata instance for each model to avoid conflicts
-    metadata = MetaData()
-    
-    # Define reserved keywords to skip
-    reserved_keywords = {
-        'id', 'project_id', 'user_id', 'created_at', 'updated_at',
-        'total', 'sum', 'count', 'avg', 'min', 'max', 'select', 'from', 'where',
-        'order', 'group', 'by', 'having', 'join', 'left', 'right', 'inner',
-        'outer', 'on', 'as', 'and', 'or', 'not', 'null', 'true', 'false',
-        'index', 'key', 'primary', 'foreign', 'unique', 'check', 'default',
-        'constraint', 'table', 'database', 'schema', 'view', 'procedure',
-        'function', 'trigger', 'sequence', 'user', 'password', 'grant',
-        'revoke', 'commit', 'rollback', 'transaction', 'lock', 'deadlock'
-    }
+    kinds = kinds or {}
+    names = names or {}
+    
+    # Shared metadata that also holds projects/users, so the foreign keys resolve
+    metadata = get_metadata()
     
     # Create table definition directly
     table_columns = [
         Column('id', Integer, primary_key=True, index=True),
         Column('project_id', Integer, ForeignKey("projects.id"), nullable=False),
         Column('user_id', Integer, ForeignKey("users.id"), nullable=False),
+        Column('row_hash', String(32)),
         Column('created_at', DateTime(timezone=True), server_default=func.now()),
         Column('updated_at', DateTime(timezone=True), onupdate=func.now())
     ]
     
     # Add columns for each Excel column
+    data_columns = []
+    text_columns = []
     for col in columns:
-        # Clean column name
-        clean_col = re.sub(r'[^a-zA-Z0-9]', '_', col.lower())
-        clean_col = re.sub(r'_+', '_', clean_col).strip('_')
-        
-        # Handle reserved keywords by adding prefix
-        if clean_col in reserved_keywords:
-            clean_col = f"excel_{clean_col}"
-        elif not clean_col:
+        clean_col = names.get(col) or clean_column_name(col)
+        if not clean_col:
             continue
-            
-        # Add the column as Text type to handle any data
-        table_columns.append(Column(clean_col, Text))
+        
+        # Typed by inference, Text for anything that was not inferred
+        kind = kinds.get(col, STRING)
+        table_columns.append(Column(clean_col, sql_type(kind)))
+        data_columns.append(clean_col)
+        if kind == STRING:
+            text_columns.append(clean_col)
+    
+    # Same (project_id, id) and lookup indexes as the mapped project tables
+    lookup_columns = [col for col in LOOKUP_COLUMNS if col in data_columns]
+    indexes = project_table_indexes(table_name, lookup_columns, text_columns)
     
     # Create the table
-    table = Table(table_name, metadata, *table_columns, extend_existing=True)
+    table = Table(table_name, metadata, *table_columns, *indexes, extend_existing=True)
     
     return table
 
-def import_sheet_data_dynamic(sheet_name, df, project_id, user_id, db, table_name):
-    """Import data from a sheet into a dynamically created table"""
-    try:
-        # Define reserved keywords to skip
-        reserved_keywords = {
-            'id', 'project_id', 'user_id', 'created_at', 'updated_at',
-            'total', 'sum', 'count', 'avg', 'min', 'max', 'select', 'from', 'where',
-            'order', 'group', 'by', 'having', 'join', 'left', 'right', 'inner',
-            'outer', 'on', 'as', 'and', 'or', 'not', 'null', 'true', 'false',
-            'index', 'key', 'primary', 'foreign', 'unique', 'check', 'default',
-            'constraint', 'table', 'database', 'schema', 'view', 'procedure',
-            'function', 'trigger', 'sequence', 'user', 'password', 'grant',
-            'revoke', 'commit', 'rollback', 'transaction', 'lock', 'deadlock'
-        }
-        
-        # Get valid and skipped columns for debugging
-        valid_columns, skipped_columns = get_valid_columns(df.columns)
-        
-        # Show debugging info
-       
-       
-        
-        # Check if we have any valid columns
-        if not valid_columns:
-          
-            return 0, len(df)
-        
-        # Create dynamic table for this sheet
-        table = create_dynamic_table_model(table_name, df.columns)
-        
-        # Debug: Show table structure
-        
-        # Use existing table structure if table exists
-        try:
-            from sqlalchemy import inspect, text
-            inspector = inspect(db.bind)
-            existing_tables = inspector.get_table_names()
-           
-            if table_name in existing_tables:
-                
-                
-                # Get existing table columns
-                existing_columns = []
-                for column in inspector.get_columns(table_name):
-                    existing_columns.append(column['name'])
-                
-                
-                
-                # Use existing table instead of creating new one
-                from sqlalchemy import Table as SQLTable, MetaData
-                metadata = MetaData()
-                existing_table = SQLTable(table_name, metadata, autoload_with=db.bind)
-                table = existing_table
-                
+def create_mapped_table_model(table_name, layout, df):
+    """
+    Table for a sheet that carries a mapped sheet's headers.
+    
+    When the sheet is stored in its mapping's own table, that is the
+    registry model's table, so the mapped importer can write to it too.
+    Under any other name the table is built dynamically, but mapped
+    headers keep their registry column names and kinds.
+    """
+    from src.ingest import SHEET_MAPPINGS, get_model
+    from src.inference import infer_kinds
+    from src.table_cache import get_metadata
+    
+    model_table = get_model(layout.mapped_sheet).__table__
+    if model_table.name == table_name:
+        metadata = get_metadata()
+        if table_name in metadata.tables:
+            metadata.remove(metadata.tables[table_name])
+        return model_table.to_metadata(metadata)
+    
+    mapping = SHEET_MAPPINGS[layout.mapped_sheet]['columns']
+    kinds = infer_kinds(df)
+    kinds.update({header: kind for header, (_, kind, _) in mapping.items() if header in kinds})
+    names = {header: candidates[0] for header, candidates in layout.targets}
+    return create_dynamic_table_model(table_name, df.columns, kinds, names)
+
+class ImportErrorLog:
+    """
+    Row errors of an import, aggregated by reason.
+    
+    Every error is counted, but only the first few row numbers and messages
+    of each reason are kept, so memory and rendering cost do not grow with
+    the number of bad rows.
+    """
+    
+    def __init__(self, max_examples=MAX_ERROR_EXAMPLES):
+        self.max_examples = max_examples
+        self.counts = {}
+        self.examples = {}
+    
+    def add(self, sheet_name, reason, row=None, detail=None, count=1):
+        key = (sheet_name, reason)
+        self.counts[key] = self.counts.get(key, 0) + count
+        examples = self.examples.setdefault(key, [])
+        if len(examples) < self.max_examples:
+            if row is None:
+                examples.append(str(detail))
             else:
-                # Create new table only if it doesn't exist
-               
-                table.create(db.bind, checkfirst=True)
-                
-        except Exception as table_error:
-            
-            return 0, len(df)
-        
-        imported_count = 0
-        error_count = 0
+                examples.append(f"row {row}: {detail}" if detail else f"row {row}")
+    
+    def total(self, sheet_name=None):
+        return sum(count for (sheet, _), count in self.counts.items() if sheet_name in (None, sheet))
+    
+    def export(self):
+        """Plain (sheet, reason, count, examples) tuples, e.g. to return from a worker process"""
+        return [(sheet, reason, count, self.examples[(sheet, reason)]) for (sheet, reason), count in self.counts.items()]
+    
+    def merge(self, exported):
+        """Add the errors exported by another log"""
+        for sheet, reason, count, examples in exported:
+            key = (sheet, reason)
+            self.counts[key] = self.counts.get(key, 0) + count
+            kept = self.examples.setdefault(key, [])
+            kept.extend(examples[:self.max_examples - len(kept)])
+    
+    def to_records(self):
+        """One row per sheet and reason, for display as a table"""
+        return [
+            {
+                'Sheet': sheet,
+                'Reason': reason,
+                'Rows': count,
+                'Examples': '; '.join(self.examples[(sheet, reason)])
+            }
+            for (sheet, reason), count in self.counts.items()
+        ]
+
+def iter_sheet_import(sheet_name, df, project_id, user_id, db, table_name, errors, chunk_size=None):
+    """
+    Headless import of one sheet into its dynamic table.
+    
+    Yields a progress event per written chunk: a dict with rows_done,
+    total_rows, imported, errors and skipped. Row problems and rows dropped
+    by the sheet's skip rules go into errors (an ImportErrorLog) instead of
+    the page, so nothing here touches the UI; skipped rows are not counted
+    as errors.
+    """
+    from src.ingest import BATCH_SIZE, coerce_column, skip_masks
+    from src.inference import infer_kinds, kind_for_type
+    from src.fingerprints import ROW_HASH, RowSync, row_hash
+    from src.table_cache import get_table, create_table
+    
+    chunk_size = chunk_size or BATCH_SIZE
+    total_rows = len(df)
+    event = {'sheet': sheet_name, 'rows_done': 0, 'total_rows': total_rows, 'imported': 0, 'errors': 0, 'skipped': 0}
+    
+    # Check if we have any valid columns
+    layout, _ = sheet_layout(sheet_name, df.columns)
+    if not layout.valid_columns:
+        errors.add(sheet_name, 'No importable columns', count=total_rows)
+        yield dict(event, rows_done=total_rows, errors=total_rows)
+        return
+    
+    # Use the cached table structure if the table exists, otherwise create it
+    try:
+        table = get_table(db.bind, table_name)
+        if table is None and layout.mapped_sheet:
+            table = create_table(db.bind, create_mapped_table_model(table_name, layout, df))
+        elif table is None:
+            kinds = infer_kinds(df)
+            table = create_table(db.bind, create_dynamic_table_model(table_name, df.columns, kinds))
+    except Exception as table_error:
+        errors.add(sheet_name, 'Table could not be created', detail=str(table_error), count=total_rows)
+        yield dict(event, rows_done=total_rows, errors=total_rows)
+        return
+    
+    # Drop Total rows (and whatever else the sheet's rules match) as whole-column masks
+    skip = np.zeros(len(df), dtype=bool)
+    for reason, mask in skip_masks(sheet_name, df).items():
+        record_rows(errors, sheet_name, f"{reason} skipped", df.index, mask)
+        skip |= mask
+    skipped_count = int(skip.sum())
+    df = df[~skip]
+    
+    # Resolve header -> SQL column once for the whole sheet
+    column_plan = layout.column_plan(table)
+    sql_columns = [clean_col for _, clean_col in column_plan]
+    
+    # Convert each mapped column to its table column's type in one pass, None
+    # for nulls; values that do not fit are stored as NULL and reported
+    converted = []
+    for header, clean_col in column_plan:
+        values, bad = coerce_column(df[header], kind_for_type(table.c[clean_col].type))
+        if bad.any():
+            record_outliers(errors, sheet_name, header, df[header], bad)
+        converted.append(values)
+    
+    # Rows left with no value in any mapped column
+    if converted:
+        empty = np.column_stack([pd.isna(values) for values in converted]).all(axis=1)
+    else:
+        empty = np.ones(len(df), dtype=bool)
+    record_rows(errors, sheet_name, 'No valid data', df.index, empty)
+    
+    imported_count = 0
+    error_count = int(empty.sum())
+    batch = []
+    event['skipped'] = skipped_count
+    
+    # Rows the project already holds unchanged are left alone
+    sync = RowSync(db, table, project_id)
+    
+    rows = zip(empty, zip(*converted) if converted else [()] * len(df))
+    for position, (is_empty, values) in enumerate(rows, start=1 + skipped_count):
+        if is_empty:
+            continue
         
-        for index, row in df.iterrows():
-            try:
-                # Skip rows that have "Total" in their name or first column value
-                skip_row = False
-                
-                # Check if the row index or first column contains "Total"
-                if isinstance(index, str) and 'total' in str(index).lower():
-                    skip_row = True
-                    
-                elif len(row) > 0:
-                    first_value = str(row.iloc[0]).lower() if pd.notna(row.iloc[0]) else ""
-                    if 'total' in first_value:
-                        skip_row = True
-                       
-                
-                if skip_row:
-                    error_count += 1
-                    continue
-                
-                # Prepare data for insertion
-                data = {
-                    'project_id': project_id,
-                    'user_id': user_id
-                }
-                
-                valid_data_found = False
-                
-                # Debug: Show first few rows being processed
-                if index < 3:  # Only show first 3 rows for debugging
-                    st.write(f"🔍 Processing row {index}: {list(row.head(3).values)}")
-                
-                # Add each column value
-                for col in df.columns:
-                    clean_col = re.sub(r'[^a-zA-Z0-9]', '_', col.lower())
-                    clean_col = re.sub(r'_+', '_', clean_col).strip('_')
-                    
-                    # Handle reserved keywords by adding prefix
-                    if clean_col in reserved_keywords:
-                        clean_col = f"excel_{clean_col}"
-                    elif not clean_col:
-                        continue
-                    
-                    # Check if column exists in the table
-                    if hasattr(table, 'columns') and clean_col in [c.name for c in table.columns]:
-                        # Convert value to string
-                        value = row[col]
-                        if pd.notna(value):
-                            data[clean_col] = str(value)
-                            valid_data_found = True
-                        else:
-                            data[clean_col] = None
-                    # else:
-                    #     # Skip columns that don't exist in the table
-                    #     if index < 3:  # Only show for first few rows
-                    #         st.write(f"⚠️ Skipping column '{clean_col}' (not in table)")
-                
-                # Only insert if we have valid data columns
-                if valid_data_found and len(data) > 2:  # More than just project_id and user_id
-                    try:
-                        db.execute(table.insert().values(**data))
-                        imported_count += 1
-                        # if imported_count % 10 == 0:  # Show progress every 10 rows
-                        #     st.write(f"✅ Imported {imported_count} rows so far...")
-                    except Exception as insert_error:
-                        st.error(f"❌ Insert error on row {index}: {insert_error}")
-                        error_count += 1
-                        continue
-                else:
-                    st.write(f"⚠️ Skipping row {index} (no valid data found)")
-                    error_count += 1
-                    continue
-                
-            except Exception as e:
-                error_count += 1
+        data = dict(zip(sql_columns, values))
+        if sync.enabled:
+            fingerprint = row_hash(values)
+            if sync.claim(fingerprint):
                 continue
+            data[ROW_HASH] = fingerprint
+        data['project_id'] = project_id
+        data['user_id'] = user_id
+        batch.append(data)
         
-        return imported_count, error_count
-        
-    except Exception as e:
-        st.error(f"Error creating/importing to table {table_name}: {e}")
-        return 0, 0
+        if len(batch) >= chunk_size:
+            inserted, failed = insert_rows(db, table, batch, sheet_name, errors)
+            imported_count += inserted
+            error_count += failed
+            batch = []
+            yield dict(event, rows_done=position, imported=imported_count, errors=error_count)
+    
+    if batch:
+        inserted, failed = insert_rows(db, table, batch, sheet_name, errors)
+        imported_count += inserted
+        error_count += failed
+    
+    sync.delete_stale(chunk_size)
+    yield dict(event, rows_done=total_rows, imported=imported_count, errors=error_count)
+
+def record_rows(errors, sheet_name, reason, index, mask):
+    """Report the rows a mask selects under one reason, with a few example row numbers"""
+    positions = np.flatnonzero(mask)
+    for position in positions[:errors.max_examples]:
+        errors.add(sheet_name, reason, row=index[position])
+    if len(positions) > errors.max_examples:
+        errors.add(sheet_name, reason, count=len(positions) - errors.max_examples)
+
+def record_outliers(errors, sheet_name, header, series, bad):
+    """Report cells that did not fit their column's type, with a few examples"""
+    reason = f"Type outlier in '{header}' stored as NULL"
+    positions = np.flatnonzero(bad)
+    for position in positions[:errors.max_examples]:
+        errors.add(sheet_name, reason, row=series.index[position], detail=repr(series.iloc[position]))
+    if len(positions) > errors.max_examples:
+        errors.add(sheet_name, reason, count=len(positions) - errors.max_examples)
+
+def import_sheet_data_dynamic(sheet_name, df, project_id, user_id, db, table_name, errors=None, on_progress=None):
+    """
+    Import data from a sheet into a dynamically created table
+    
+    Runs iter_sheet_import to the end, passing each progress event to
+    on_progress. Returns (imported, errors, skipped).
+    """
+    errors = errors if errors is not None else ImportErrorLog()
+    event = {'imported': 0, 'errors': 0, 'skipped': 0}
+    for event in iter_sheet_import(sheet_name, df, project_id, user_id, db, table_name, errors):
+        if on_progress:
+            on_progress(event)
+    return event['imported'], event['errors'], event['skipped']
+
+def insert_rows(db, table, rows, sheet_name=None, errors=None):
+    """
+    Insert a batch of rows as one multi-row insert.
+    
+    If the batch fails, the rows are retried one at a time so a single bad
+    row does not drop the whole batch; failures go to errors. Returns
+    (imported, errors).
+    """
+    try:
+        with db.begin_nested():
+            db.execute(table.insert(), rows)
+        return len(rows), 0
+    except Exception:
+        pass
+    
+    imported_count = 0
+    error_count = 0
+    for row in rows:
+        try:
+            with db.begin_nested():
+                db.execute(table.insert(), row)
+            imported_count += 1
+        except Exception as insert_error:
+            if errors is not None:
+                errors.add(sheet_name, 'Insert failed', detail=str(getattr(insert_error, 'orig', insert_error)))
+            error_count += 1
+    return imported_count, error_count
 
-def import_sheet_data(sheet_name, df, project_id, user_id, db):
+def import_sheet_data(sheet_name, df, project_id, user_id, db, errors=None, on_progress=None):
     """Import data from a specific sheet with dynamic table mapping"""
     # Get the table name for this sheet
     table_name = get_table_mapping(sheet_name)
     
     # Use dynamic import for all sheets
-    return import_sheet_data_dynamic(sheet_name, df, project_id, user_id, db, table_name)
+    return import_sheet_data_dynamic(sheet_name, df, project_id, user_id, db, table_name, errors, on_progress)
 
 def get_reserved_keywords():
     """Get list of reserved keywords that will be skipped"""
-    return {
-        'id', 'project_id', 'user_id', 'created_at', 'updated_at',
-        'total', 'sum', 'count', 'avg', 'min', 'max', 'select', 'from', 'where',
-        'order', 'group', 'by', 'having', 'join', 'left', 'right', 'inner',
-        'outer', 'on', 'as', 'and', 'or', 'not', 'null', 'true', 'false',
-        'index', 'key', 'primary', 'foreign', 'unique', 'check', 'default',
-        'constraint', 'table', 'database', 'schema', 'view', 'procedure',
-        'function', 'trigger', 'sequence', 'user', 'password', 'grant',
-        'revoke', 'commit', 'rollback', 'transaction', 'lock', 'deadlock'
-    }
+    return RESERVED_KEYWORDS
+
+def clean_column_name(col):
+    """Convert an Excel header into its SQL column name ('' if nothing is left)"""
+    clean_col = NON_ALNUM_RE.sub('_', str(col).lower())
+    clean_col = UNDERSCORES_RE.sub('_', clean_col).strip('_')
+    
+    # Handle reserved keywords by adding prefix
+    if clean_col in RESERVED_KEYWORDS:
+        clean_col = f"excel_{clean_col}"
+    return clean_col
 
 def get_valid_columns(columns):
     """Get list of valid columns after filtering reserved keywords"""
@@ -291,6 +407,40 @@ def get_valid_columns(columns):
     
     return valid_columns, skipped_columns
 
+def classify_layout(columns, signature, mapped_sheet=None):
+    """
+    Full examination of a header row not seen before.
+    
+    Headers of a mapped sheet prefer the ingest registry's column name and
+    fall back to their cleaned name, so tables created either way match.
+    """
+    from src.ingest import SHEET_MAPPINGS
+    from src.signatures import SheetLayout
+    
+    mapping = SHEET_MAPPINGS[mapped_sheet]['columns'] if mapped_sheet else {}
+    valid_columns, skipped_columns = get_valid_columns(columns)
+    targets = []
+    for col in columns:
+        candidates = [mapping[col][0]] if col in mapping else []
+        clean_col = clean_column_name(col)
+        if clean_col and clean_col not in candidates:
+            candidates.append(clean_col)
+        if candidates:
+            targets.append((col, candidates))
+    return SheetLayout(signature, columns, valid_columns, skipped_columns, targets, mapped_sheet)
+
+def sheet_layout(sheet_name, columns):
+    """
+    Layout of a sheet's header row, from the signature cache when known.
+    
+    Returns (layout, known).
+    """
+    from src.signatures import get_layout, seed_layouts
+    
+    # Standard Accubid sheets are compiled on first use; later calls are cache hits
+    seed_layouts(classify_layout)
+    return get_layout(sheet_name, columns, classify_layout)
+
 def examine_excel_file(uploaded_file):
     """Examine the uploaded Excel file structure"""
     if uploaded_file is None:
@@ -298,43 +448,68 @@ def examine_excel_file(uploaded_file):
         return None
     
     try:
-        # Read the uploaded file
-        excel_file_obj = pd.ExcelFile(uploaded_file)
-        sheets_info = {}
-        
-        for sheet_name in excel_file_obj.sheet_names:
-            df = pd.read_excel(uploaded_file, sheet_name=sheet_name)
-            df = clean_dataframe(df)
-            
-            # Get the table name for this sheet
-            table_name = get_table_mapping(sheet_name)
-            
-            # Get valid and skipped columns
-            valid_columns, skipped_columns = get_valid_columns(df.columns)
-            
-            sheets_info[sheet_name] = {
-                'shape': df.shape,
-                'columns': list(df.columns),
-                'valid_columns': valid_columns,
-                'skipped_columns': skipped_columns,
-                'sample_data': df.head(3).to_dict('records'),
-                'data_types': df.dtypes.to_dict(),
-                'non_null_counts': df.count().to_dict(),
-                'table_name': table_name
-            }
+        from src.workbook import content_digest
         
-        return sheets_info
+        # Keyed by content hash, so re-examining the same upload skips the parse
+        return examine_workbook(content_digest(uploaded_file), uploaded_file)
     except Exception as e:
         st.error(f"Error examining Excel file: {e}")
         return None
 
+@st.cache_data(show_spinner=False, max_entries=16)
+def examine_workbook(digest, _uploaded_file):
+    """Sheet summaries for a workbook, cached by its content digest"""
+    from src.workbook import read_sheet, get_workbook
+    from src.ingest import db_records
+    
+    # Parse the upload once; the import step reuses the same workbook
+    workbook = get_workbook(_uploaded_file)
+    sheets_info = {}
+    
+    for sheet_name in workbook.sheet_names:
+        df = read_sheet(workbook, sheet_name)
+        df = clean_dataframe(df)
+        
+        # Get the table name for this sheet
+        table_name = get_table_mapping(sheet_name)
+        
+        # Known header rows reuse their classified layout; only new ones are examined in full
+        layout, known = sheet_layout(sheet_name, df.columns)
+        
+        sheets_info[sheet_name] = {
+            'shape': df.shape,
+            'columns': list(df.columns),
+            'valid_columns': layout.valid_columns,
+            'skipped_columns': layout.skipped_columns,
+            'sample_data': db_records(df.head(3)),
+            'data_types': df.dtypes.to_dict(),
+            'non_null_counts': None if known else df.count().to_dict(),
+            'table_name': table_name,
+            'known_layout': known,
+            'mapped_sheet': layout.mapped_sheet
+        }
+    
+    return sheets_info
+
+@st.cache_resource(show_spinner=False)
+def get_session_factory():
+    """
+    Session factory shared by every session and rerun of this process.
+    
+    The connection is tested once; a failure raises, so it is not cached
+    and the next rerun tries again.
+    """
+    from src.database import SessionLocal, test_connection
+    if not test_connection():
+        raise ConnectionError("Database connection failed")
+    return SessionLocal
+
 def get_db_session():
     """Get database session from session state or create new one"""
-    if 'db_session' not in st.session_state:
-        from src.database import SessionLocal, test_connection
-        if test_connection():
-            st.session_state.db_session = SessionLocal()
-        else:
+    if st.session_state.get('db_session') is None:
+        try:
+            st.session_state.db_session = get_session_factory()()
+        except ConnectionError:
             st.error("Database connection failed")
             return None
     return st.session_state.db_session
@@ -348,14 +523,38 @@ def close_db_session():
         except:
             pass
 
-def import_excel_data(uploaded_file, selected_sheets):
-    """Import Excel data from uploaded file"""
+def import_sheet_job(sheet_name, df, db, project_id, user_id):
+    """Worker entry point for parallel mode: clean and import one raw sheet"""
+    df = clean_dataframe(df)
+    errors = ImportErrorLog()
+    imported_count, error_count, skipped_count = import_sheet_data(sheet_name, df, project_id, user_id, db, errors)
+    return {
+        'imported': imported_count,
+        'errors': error_count,
+        'skipped': skipped_count,
+        'total_rows': len(df),
+        'table_name': get_table_mapping(sheet_name),
+        'error_log': errors.export()
+    }
+
+def import_excel_data(uploaded_file, selected_sheets, workers=None, on_progress=None):
+    """
+    Import Excel data from uploaded file
+    
+    With workers > 1 (or IMPORT_WORKERS set) each sheet is imported by its
+    own worker process with its own database connection. on_progress
+    (fraction, text) is called after every written chunk (per sheet in
+    parallel mode); row errors are returned as one aggregated table.
+    """
     if uploaded_file is None:
         st.error("No file uploaded")
         return None
     
     try:
         from src.models import User, Project
+        from src.workbook import get_workbook, read_sheet
+        from src.parallel import IMPORT_WORKERS, import_sheets_parallel
+        from src.fingerprints import SheetFingerprints, find_project_id, record_import, sheet_hash
         
         # Get existing database session
         db = get_db_session()
@@ -368,45 +567,135 @@ def import_excel_data(uploaded_file, selected_sheets):
                 st.error("No users found in database")
                 return None
             
-            # Extract project name from file name
-            project_name = extract_project_name(uploaded_file.name)
+            # A re-upload of the same bid updates the project it was imported into
+            workbook = get_workbook(uploaded_file)
+            file_hash = workbook.digest
+            project_id = find_project_id(db, file_hash)
+            project = db.get(Project, project_id) if project_id else None
             
-            project = Project(
-                name=project_name,
-                description=f"Excel import from {uploaded_file.name} at {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}",
-                status="active"
-            )
-            db.add(project)
-            db.commit()
-            db.refresh(project)
+            if project is None:
+                # Extract project name from file name
+                project_name = extract_project_name(uploaded_file.name)
+                
+                project = Project(
+                    name=project_name,
+                    description=f"Excel import from {uploaded_file.name} at {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}",
+                    status="active"
+                )
+                db.add(project)
+                db.commit()
+                db.refresh(project)
             
             results = {}
             total_imported = 0
             total_errors = 0
+            total_skipped = 0
+            workers = IMPORT_WORKERS if workers is None else workers
+            fingerprints = SheetFingerprints(db, project.id, file_hash)
+            errors = ImportErrorLog()
             
+            def sheet_progress(position, sheet_name):
+                """Turn one sheet's chunk events into overall progress"""
+                def report(event):
+                    if on_progress:
+                        done = event['rows_done'] / event['total_rows'] if event['total_rows'] else 1.0
+                        on_progress(
+                            min((position + done) / len(selected_sheets), 1.0),
+                            f"{sheet_name}: {event['rows_done']:,} of {event['total_rows']:,} rows, "
+                            f"{event['imported']:,} imported"
+                        )
+                return report
+            
+            # Sheets already imported from this exact workbook are not read again
+            pending_sheets = []
             for sheet_name in selected_sheets:
-                try:
-                    df = pd.read_excel(uploaded_file, sheet_name=sheet_name)
-                    df = clean_dataframe(df)
-                    imported_count, error_count = import_sheet_data(sheet_name, df, project.id, user.id, db)
-                    results[sheet_name] = {
-                        'imported': imported_count,
-                        'errors': error_count,
-                        'total_rows': len(df),
-                        'table_name': get_table_mapping(sheet_name)
-                    }
-                    total_imported += imported_count
-                    total_errors += error_count
-                    db.commit()
-                except Exception as e:
+                if fingerprints.unchanged_file(sheet_name):
                     results[sheet_name] = {
                         'imported': 0,
                         'errors': 0,
                         'total_rows': 0,
                         'table_name': get_table_mapping(sheet_name),
-                        'error': str(e)
+                        'unchanged': True
                     }
-                    db.rollback()
+                else:
+                    pending_sheets.append(sheet_name)
+            
+            if workers > 1 and len(pending_sheets) > 1:
+                sheet_results = import_sheets_parallel(
+                    uploaded_file, pending_sheets, project.id, user.id,
+                    'excel_import_streamlit:import_sheet_job', workers
+                )
+                for sheet_name in pending_sheets:
+                    result = sheet_results[sheet_name]
+                    if isinstance(result, Exception):
+                        result = {
+                            'imported': 0,
+                            'errors': 0,
+                            'total_rows': 0,
+                            'table_name': get_table_mapping(sheet_name),
+                            'error': str(result)
+                        }
+                    else:
+                        digest, result = result
+                        fingerprints.record(sheet_name, digest, result['total_rows'])
+                        errors.merge(result.pop('error_log', []))
+                    results[sheet_name] = result
+                    total_imported += result['imported']
+                    total_errors += result['errors']
+                    total_skipped += result.get('skipped', 0)
+                db.commit()
+            else:
+                for sheet_name in pending_sheets:
+                    position = selected_sheets.index(sheet_name)
+                    if on_progress:
+                        on_progress(position / len(selected_sheets), f"Reading {sheet_name}...")
+                    try:
+                        df = read_sheet(workbook, sheet_name)
+                        digest = sheet_hash(df)
+                        df = clean_dataframe(df)
+                        if fingerprints.unchanged(sheet_name, digest):
+                            results[sheet_name] = {
+                                'imported': 0,
+                                'errors': 0,
+                                'total_rows': len(df),
+                                'table_name': get_table_mapping(sheet_name),
+                                'unchanged': True
+                            }
+                            db.commit()
+                            continue
+                        
+                        imported_count, error_count, skipped_count = import_sheet_data(
+                            sheet_name, df, project.id, user.id, db, errors, sheet_progress(position, sheet_name)
+                        )
+                        results[sheet_name] = {
+                            'imported': imported_count,
+                            'errors': error_count,
+                            'skipped': skipped_count,
+                            'total_rows': len(df),
+                            'table_name': get_table_mapping(sheet_name)
+                        }
+                        total_imported += imported_count
+                        total_errors += error_count
+                        total_skipped += skipped_count
+                        fingerprints.record(sheet_name, digest, len(df))
+                        db.commit()
+                    except Exception as e:
+                        results[sheet_name] = {
+                            'imported': 0,
+                            'errors': 0,
+                            'total_rows': 0,
+                            'table_name': get_table_mapping(sheet_name),
+                            'error': str(e)
+                        }
+                        db.rollback()
+            
+            # Only a complete import lets the next upload of this file be skipped
+            if not any(result.get('error') for result in results.values()):
+                record_import(db, project.id, user.id, uploaded_file.name, file_hash)
+                db.commit()
+            
+            if on_progress:
+                on_progress(1.0, "Import finished")
             
             return {
                 'project_id': project.id,
@@ -414,6 +703,8 @@ def import_excel_data(uploaded_file, selected_sheets):
                 'results': results,
                 'total_imported': total_imported,
                 'total_errors': total_errors,
+                'total_skipped': total_skipped,
+                'error_log': errors.to_records(),
                 'filename': uploaded_file.name
             }
         
@@ -507,6 +798,7 @@ def main():
         st.sidebar.error("❌ Database Disconnected")
         if st.sidebar.button("🔗 Reconnect Database"):
             close_db_session()
+            get_session_factory.clear()
             st.rerun()
     
     # Show reserved keywords info
@@ -589,7 +881,9 @@ def main():
                     warning_text = f"⚠️ {len(sheet_info['skipped_columns'])} columns renamed"
                 
                 # Add info about row skipping
-                row_info = "📋 Rows with 'Total' will be skipped"
+                row_info = "📋 Total and blank-key rows will be skipped"
+                if sheet_info.get('mapped_sheet'):
+                    row_info = f"🧩 Standard {sheet_info['mapped_sheet']} layout · {row_info}"
                 
                 st.markdown(f"""
                 <div class="metric-card">
@@ -656,9 +950,21 @@ def main():
                 table_name = st.session_state.sheets_data[sheet_name]['table_name']
                 st.info(f"📋 `{sheet_name}` → `{table_name}`")
             
+            parallel = st.checkbox(
+                "⚡ Import sheets in parallel",
+                help="Import each selected sheet in its own worker process"
+            )
+            
             if st.button("📥 Import Selected Sheets", type="primary"):
                 with st.spinner("Importing data..."):
-                    result = import_excel_data(st.session_state.uploaded_file, st.session_state.selected_sheets)
+                    workers = os.cpu_count() if parallel else 1
+                    
+                    # One progress bar for the whole import, updated once per written chunk
+                    progress_bar = st.progress(0.0, text="Starting import...")
+                    result = import_excel_data(
+                        st.session_state.uploaded_file, st.session_state.selected_sheets, workers,
+                        on_progress=lambda fraction, text: progress_bar.progress(fraction, text=text)
+                    )
                     
                     if result:
                         st.markdown("""
@@ -687,13 +993,19 @@ def main():
                         
                         results_data = []
                         for sheet_name, sheet_result in result['results'].items():
-                            status = "✅ Success" if sheet_result.get('error') is None else "❌ Error"
+                            if sheet_result.get('error') is not None:
+                                status = "❌ Error"
+                            elif sheet_result.get('unchanged'):
+                                status = "⏭️ Unchanged"
+                            else:
+                                status = "✅ Success"
                             results_data.append({
                                 "Sheet": sheet_name,
                                 "Table": sheet_result['table_name'],
                                 "Total Rows": sheet_result['total_rows'],
                                 "Imported": sheet_result['imported'],
                                 "Errors": sheet_result['errors'],
+                                "Skipped": sheet_result.get('skipped', 0),
                                 "Status": status
                             })
                         
@@ -704,6 +1016,12 @@ def main():
                         for sheet_name, sheet_result in result['results'].items():
                             if sheet_result.get('error'):
                                 st.error(f"Error in {sheet_name}: {sheet_result['error']}")
+                        
+                        # Skipped and failed rows, one line per sheet and reason
+                        if result['error_log']:
+                            st.subheader("⚠️ Skipped and Failed Rows")
+                            st.caption(f"Up to {MAX_ERROR_EXAMPLES} example rows are shown per reason")
+                            st.dataframe(pd.DataFrame(result['error_log']), use_container_width=True)
         else:
             st.info("👆 Select sheets above to import data")
     
@@ -3,14 +3,13 @@
 Web Interface for Excel Import System
 """
 
-from flask import Flask, render_template, request, jsonify, flash, redirect, url_for
-import pandas as pd
+from flask import Flask, render_template, request, jsonify, url_for, Response, stream_with_context
 import sys
 import os
 from dotenv import load_dotenv
 from datetime import datetime
-import numpy as np
 import json
+import time
 
 # Add the src directory to the Python path
 sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
@@ -22,237 +21,37 @@ app = Flask(__name__)
 app.secret_key = 'your-secret-key-here'
 
 def clean_dataframe(df):
-    """Clean dataframe by removing empty rows and handling NaN values"""
-    # Remove rows where all values are NaN
-    df = df.dropna(how='all')
+    """Clean dataframe by removing empty rows, keeping native column dtypes"""
+    from src.ingest import clean_frame
     
-    # Replace NaN with None for database compatibility
-    df = df.replace({np.nan: None})
-    
-    return df
+    # NaN stays NaN here; it becomes None only when rows are written
+    return clean_frame(df)
 
-def import_sheet_data(sheet_name, df, project_id, user_id, db):
+def import_sheet_data(sheet_name, df, project_id, user_id, db, on_progress=None, skipped=None, outliers=None):
     """Import data from a specific sheet"""
-    from src.models import ProjectItem, ProjectDirlib, ProjectInclb, ProjectLbfac, ProjectIndlb
-    
-    imported_count = 0
-    error_count = 0
+    from src.ingest import import_sheet
     
-    if sheet_name == 'Ext':
-        # Filter out rows with empty descriptions
-        valid_rows = []
-        for index, row in df.iterrows():
-            description = row['Description']
-            if pd.notna(description) and str(description).strip() != '':
-                valid_rows.append((index, row))
-        
-        for index, row in valid_rows:
-            try:
-                # Convert date to string if it's a datetime
-                date_value = row['Date']
-                if pd.notna(date_value) and hasattr(date_value, 'strftime'):
-                    date_value = date_value.strftime('%Y-%m-%d %H:%M:%S')
-                
-                project_item = ProjectItem(
-                    project_id=project_id,
-                    user_id=user_id,
-                    description=str(row['Description']),
-                    quantity=float(row['Quantity']) if pd.notna(row['Quantity']) else 1.0,
-                    date=date_value,
-                    trade_price=float(row['Trade Price']) if pd.notna(row['Trade Price']) else None,
-                    price_unit=str(row['Price Unit']) if pd.notna(row['Price Unit']) else None,
-                    discount_percent=float(row['Disc %']) if pd.notna(row['Disc %']) else 0.0,
-                    link_price=float(row['Link Price']) if pd.notna(row['Link Price']) else None,
-                    cost_adjustment_percent=float(row['Cost Adj %']) if pd.notna(row['Cost Adj %']) else 0.0,
-                    net_cost=float(row['Net Cost']) if pd.notna(row['Net Cost']) else None,
-                    db_labor=float(row['DB Labor']) if pd.notna(row['DB Labor']) else None,
-                    labor=float(row['Labor']) if pd.notna(row['Labor']) else None,
-                    labor_unit=str(row['Labor Unit']) if pd.notna(row['Labor Unit']) else None,
-                    labor_adjustment_percent=float(row['Lab Adj %']) if pd.notna(row['Lab Adj %']) else 0.0,
-                    total_material=float(row['Total Material']) if pd.notna(row['Total Material']) else None,
-                    total_hours=float(row['Total Hours']) if pd.notna(row['Total Hours']) else None,
-                    material_condition=str(row['Material Condition']) if pd.notna(row['Material Condition']) else None,
-                    labor_condition=str(row['Labor Condition']) if pd.notna(row['Labor Condition']) else None,
-                    weight=float(row['Weight']) if pd.notna(row['Weight']) else None,
-                    weight_unit=str(row['Weight Unit']) if pd.notna(row['Weight Unit']) else None,
-                    total_weight=float(row['Total Weight']) if pd.notna(row['Total Weight']) else None,
-                    manufacturer_name=str(row['Manufacturer Name']) if pd.notna(row['Manufacturer Name']) else None,
-                    catalog_number=str(row['Catalog Number']) if pd.notna(row['Catalog Number']) else None,
-                    price_code=str(row['Price Code']) if pd.notna(row['Price Code']) else None,
-                    reference=str(row['Reference']) if pd.notna(row['Reference']) else None,
-                    supplier_name=str(row['Supplier Name']) if pd.notna(row['Supplier Name']) else None,
-                    supplier_code=str(row['Supplier Code']) if pd.notna(row['Supplier Code']) else None,
-                    sort_code_1=str(row['Sort Code 1']) if pd.notna(row['Sort Code 1']) else None,
-                    sort_code_2=str(row['Sort Code 2']) if pd.notna(row['Sort Code 2']) else None,
-                    sort_code_3=str(row['Sort Code 3']) if pd.notna(row['Sort Code 3']) else None,
-                    sort_code_4=str(row['Sort Code 4']) if pd.notna(row['Sort Code 4']) else None,
-                    sort_code_5=str(row['Sort Code 5']) if pd.notna(row['Sort Code 5']) else None,
-                    sort_code_6=str(row['Sort Code 6']) if pd.notna(row['Sort Code 6']) else None,
-                    sort_code_7=str(row['Sort Code 7']) if pd.notna(row['Sort Code 7']) else None,
-                    sort_code_8=str(row['Sort Code 8']) if pd.notna(row['Sort Code 8']) else None,
-                    quick_takeoff_code=str(row['Quick Takeoff Code']) if pd.notna(row['Quick Takeoff Code']) else None
-                )
-                
-                db.add(project_item)
-                imported_count += 1
-                
-            except Exception as e:
-                error_count += 1
-                continue
-    
-    elif sheet_name == 'DirLb':
-        for index, row in df.iterrows():
-            try:
-                if pd.isna(row['Labor Type']) or str(row['Labor Type']).strip() == '':
-                    continue
-                    
-                dirlib_item = ProjectDirlib(
-                    project_id=project_id,
-                    user_id=user_id,
-                    labor_type=str(row['Labor Type']) if pd.notna(row['Labor Type']) else None,
-                    crew=str(row['Crew']) if pd.notna(row['Crew']) else None,
-                    hours=str(row['Hours']) if pd.notna(row['Hours']) else None,
-                    rate=str(row['Rate $']) if pd.notna(row['Rate $']) else None,
-                    sub_total=str(row['SubTotal']) if pd.notna(row['SubTotal']) else None,
-                    brdn=str(row['Brdn %']) if pd.notna(row['Brdn %']) else None,
-                    frng=str(row['Frng $']) if pd.notna(row['Frng $']) else None,
-                    brdn_total=str(row['Brdn Tot.']) if pd.notna(row['Brdn Tot.']) else None,
-                    frng_total=str(row['Frng Tot.']) if pd.notna(row['Frng Tot.']) else None,
-                    total=str(row['Total']) if pd.notna(row['Total']) else None,
-                    full_rate=str(row['Full Rate']) if pd.notna(row['Full Rate']) else None,
-                    code=str(row['Code']) if pd.notna(row['Code']) else None,
-                    type=str(row['Type']) if pd.notna(row['Type']) else None
-                )
-                
-                db.add(dirlib_item)
-                imported_count += 1
-                
-            except Exception as e:
-                error_count += 1
-                continue
-    
-    elif sheet_name == 'IncLb':
-        for index, row in df.iterrows():
-            try:
-                if pd.isna(row['Incidental Labor']) or str(row['Incidental Labor']).strip() == '':
-                    continue
-                    
-                inclb_item = ProjectInclb(
-                    project_id=project_id,
-                    user_id=user_id,
-                    incidental_labor=str(row['Incidental Labor']) if pd.notna(row['Incidental Labor']) else None,
-                    hours=str(row['Hours']) if pd.notna(row['Hours']) else None,
-                    rate=str(row['Rate $']) if pd.notna(row['Rate $']) else None,
-                    sub_total=str(row['SubTotal']) if pd.notna(row['SubTotal']) else None,
-                    brdn=str(row['Brdn %']) if pd.notna(row['Brdn %']) else None,
-                    frng=str(row['Frng $']) if pd.notna(row['Frng $']) else None,
-                    brdn_total=str(row['Brdn Tot.']) if pd.notna(row['Brdn Tot.']) else None,
-                    frng_total=str(row['Frng Tot.']) if pd.notna(row['Frng Tot.']) else None,
-                    total=str(row['Total']) if pd.notna(row['Total']) else None,
-                    full_rate=str(row['Full Rate']) if pd.notna(row['Full Rate']) else None,
-                    code=str(row['Code']) if pd.notna(row['Code']) else None,
-                    type=str(row['Type']) if pd.notna(row['Type']) else None
-                )
-                
-                db.add(inclb_item)
-                imported_count += 1
-                
-            except Exception as e:
-                error_count += 1
-                continue
-    
-    elif sheet_name == 'LbFac':
-        for index, row in df.iterrows():
-            try:
-                if pd.isna(row['Labor Factoring']) or str(row['Labor Factoring']).strip() == '':
-                    continue
-                    
-                lbfac_item = ProjectLbfac(
-                    project_id=project_id,
-                    user_id=user_id,
-                    labor_factoring=str(row['Labor Factoring']) if pd.notna(row['Labor Factoring']) else None,
-                    factor=str(row['Factor']) if pd.notna(row['Factor']) else None,
-                    percent_of_direct_hrs=str(row['% of Direct Hrs']) if pd.notna(row['% of Direct Hrs']) else None,
-                    hours=str(row['Hours']) if pd.notna(row['Hours']) else None,
-                    rate=str(row['Rate $']) if pd.notna(row['Rate $']) else None,
-                    sub_total=str(row['SubTotal']) if pd.notna(row['SubTotal']) else None,
-                    brdn_percent=str(row['Brdn %']) if pd.notna(row['Brdn %']) else None,
-                    frng=str(row['Frng $']) if pd.notna(row['Frng $']) else None,
-                    brdn_total=str(row['Brdn Tot.']) if pd.notna(row['Brdn Tot.']) else None,
-                    frng_total=str(row['Frng Tot.']) if pd.notna(row['Frng Tot.']) else None,
-                    total=str(row['Total']) if pd.notna(row['Total']) else None,
-                    full_rate=str(row['Full Rate']) if pd.notna(row['Full Rate']) else None,
-                    code=str(row['Code']) if pd.notna(row['Code']) else None,
-                    type=str(row['Type']) if pd.notna(row['Type']) else None
-                )
-                
-                db.add(lbfac_item)
-                imported_count += 1
-                
-            except Exception as e:
-                error_count += 1
-                continue
-    
-    elif sheet_name == 'LbEsc':
-        for index, row in df.iterrows():
-            try:
-                if pd.isna(row['Escalation Period']) or str(row['Escalation Period']).strip() == '':
-                    continue
-                    
-                lbesc_item = ProjectLbfac(  # Using same model since table is project_lbesc
-                    project_id=project_id,
-                    user_id=user_id,
-                    escalation_period=str(row['Escalation Period']) if pd.notna(row['Escalation Period']) else None,
-                    description=str(row['Description']) if pd.notna(row['Description']) else None,
-                    percent_of_contract=str(row['% of Contract']) if pd.notna(row['% of Contract']) else None,
-                    labor_hours=str(row['Labor Hours']) if pd.notna(row['Labor Hours']) else None,
-                    escalation_percent=str(row['Escalation %']) if pd.notna(row['Escalation %']) else None,
-                    escalation_amount=str(row['Escalation $']) if pd.notna(row['Escalation $']) else None,
-                    financing_percent=str(row['Financing %']) if pd.notna(row['Financing %']) else None,
-                    total=str(row['Total']) if pd.notna(row['Total']) else None,
-                    code=str(row['Code']) if pd.notna(row['Code']) else None,
-                    type=str(row['Type']) if pd.notna(row['Type']) else None
-                )
-                
-                db.add(lbesc_item)
-                imported_count += 1
-                
-            except Exception as e:
-                error_count += 1
-                continue
-    
-    elif sheet_name == 'IndLb':
-        for index, row in df.iterrows():
-            try:
-                if pd.isna(row['Indirect Labor']) or str(row['Indirect Labor']).strip() == '':
-                    continue
-                    
-                indlb_item = ProjectIndlb(
-                    project_id=project_id,
-                    user_id=user_id,
-                    indirect_labor=str(row['Indirect Labor']) if pd.notna(row['Indirect Labor']) else None,
-                    labor_percent=str(row['Lab %']) if pd.notna(row['Lab %']) else None,
-                    hours=str(row['Hours']) if pd.notna(row['Hours']) else None,
-                    rate=str(row['Rate $']) if pd.notna(row['Rate $']) else None,
-                    sub_total=str(row['SubTotal']) if pd.notna(row['SubTotal']) else None,
-                    brdn=str(row['Brdn %']) if pd.notna(row['Brdn %']) else None,
-                    frng=str(row['Frng $']) if pd.notna(row['Frng $']) else None,
-                    brdn_total=str(row['Brdn Tot.']) if pd.notna(row['Brdn Tot.']) else None,
-                    frng_total=str(row['Frng Tot.']) if pd.notna(row['Frng Tot.']) else None,
-                    total=str(row['Total']) if pd.notna(row['Total']) else None,
-                    full_rate=str(row['Full Rate']) if pd.notna(row['Full Rate']) else None,
-                    code=str(row['Code']) if pd.notna(row['Code']) else None,
-                    type=str(row['Type']) if pd.notna(row['Type']) else None
-                )
-                
-                db.add(indlb_item)
-                imported_count += 1
-                
-            except Exception as e:
-                error_count += 1
-                continue
+    return import_sheet(
+        sheet_name, df, db, project_id, user_id, on_progress=on_progress, skipped=skipped, outliers=outliers
+    )
+
+def sheet_progress(progress, sheet_name, position):
+    """Row-level progress callback for one sheet, reporting rows/sec as it goes"""
+    if progress is None:
+        return None
+    started = time.perf_counter()
     
-    return imported_count, error_count
+    def on_progress(rows_done, total_rows):
+        elapsed = time.perf_counter() - started
+        progress(
+            sheet_name, position,
+            live=True,
+            status='running',
+            rows_done=rows_done,
+            total_rows=total_rows,
+            rows_per_sec=round(rows_done / elapsed) if elapsed > 0 else 0
+        )
+    return on_progress
 
 @app.route('/')
 def index():
@@ -267,18 +66,21 @@ def examine_excel():
         if not os.path.exists(excel_file):
             return jsonify({'error': 'Excel file not found'})
         
-        # Read all sheets
-        excel_file_obj = pd.ExcelFile(excel_file)
+        from src.workbook import read_sheet, get_workbook
+        from src.ingest import db_records
+        
+        # Read all sheets from the cached workbook
+        workbook = get_workbook(excel_file)
         sheets_info = {}
         
-        for sheet_name in excel_file_obj.sheet_names:
-            df = pd.read_excel(excel_file, sheet_name=sheet_name)
+        for sheet_name in workbook.sheet_names:
+            df = read_sheet(workbook, sheet_name)
             df = clean_dataframe(df)
             
             sheets_info[sheet_name] = {
                 'shape': df.shape,
                 'columns': list(df.columns),
-                'sample_data': df.head(3).to_dict('records'),
+                'sample_data': db_records(df.head(3)),
                 'data_types': df.dtypes.to_dict(),
                 'non_null_counts': df.count().to_dict()
             }
@@ -286,41 +88,48 @@ def examine_excel():
         return jsonify({
             'success': True,
             'sheets': sheets_info,
-            'total_sheets': len(excel_file_obj.sheet_names)
+            'total_sheets': len(workbook.sheet_names)
         })
         
     except Exception as e:
         return jsonify({'error': str(e)})
 
-@app.route('/import_excel', methods=['POST'])
-def import_excel():
-    """Import Excel data"""
+def run_import(excel_file, selected_sheets, revise_project_id=None, progress=None):
+    """
+    Import the selected sheets of a workbook; runs as a background job.
+    
+    progress(sheet_name, completed_sheets, **detail) is called before each
+    sheet, after every written chunk with its row counts and throughput,
+    after each sheet with its result, and once more when all are done. Returns the result shown on the page.
+    """
+    from src.database import SessionLocal, test_connection, DB_TYPE
+    from src.models import User, Project
+    from src.workbook import get_workbook, read_sheet
+    from src.ingest import IMPORT_STREAMING, SHEET_MAPPINGS, mapped_columns, revise_sheet, stream_sheet
+    from src.fingerprints import SheetFingerprints, find_project_id, record_import, sheet_hash
+    
+    # Test connection
+    if not test_connection():
+        raise RuntimeError('Database connection failed')
+    
+    db = SessionLocal()
     try:
-        data = request.get_json()
-        selected_sheets = data.get('sheets', [])
-        
-        if not selected_sheets:
-            return jsonify({'error': 'No sheets selected'})
+        # Get user
+        user = db.query(User).first()
+        if not user:
+            raise RuntimeError('No users found in database')
         
-        excel_file = r"C:\Users\navee\Downloads\Schlegel Accubid in Excel (1).xlsx"
-        
-        if not os.path.exists(excel_file):
-            return jsonify({'error': 'Excel file not found'})
+        # Re-imports of the same workbook update the project it was imported into
+        file_name = os.path.basename(excel_file)
+        workbook = get_workbook(excel_file)
+        file_hash = workbook.digest
+        project_id = int(revise_project_id) if revise_project_id else find_project_id(db, file_hash)
+        project = db.get(Project, project_id) if project_id else None
         
-        from src.database import SessionLocal, test_connection, DB_TYPE
-        from src.models import User, Project
+        if revise_project_id and project is None:
+            raise RuntimeError(f'Project {revise_project_id} not found')
         
-        # Test connection
-        if not test_connection():
-            return jsonify({'error': 'Database connection failed'})
-        
-        db = SessionLocal()
-        try:
-            # Get user
-            user = db.query(User).first()
-            if not user:
-                return jsonify({'error': 'No users found in database'})
-            
+        if project is None:
             # Create project
             project = Project(
                 name=f"Schlegel Accubid Import - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}",
@@ -330,56 +139,246 @@ def import_excel():
             db.add(project)
             db.commit()
             db.refresh(project)
-            
-            results = {}
-            total_imported = 0
-            total_errors = 0
-            
-            for sheet_name in selected_sheets:
-                try:
-                    df = pd.read_excel(excel_file, sheet_name=sheet_name)
+        
+        results = {}
+        total_imported = 0
+        total_errors = 0
+        total_skipped = 0
+        fingerprints = SheetFingerprints(db, project.id, file_hash)
+        
+        for position, sheet_name in enumerate(selected_sheets):
+            if progress:
+                progress(sheet_name, position, status='running', rows_done=0)
+            on_progress = sheet_progress(progress, sheet_name, position)
+            try:
+                # Sheets without a mapping have nowhere to go; they are reported, not failed
+                if sheet_name in workbook.sheet_names and sheet_name not in SHEET_MAPPINGS:
+                    results[sheet_name] = {'imported': 0, 'errors': 0, 'total_rows': 0, 'unsupported': True}
+                    continue
+                
+                if fingerprints.unchanged_file(sheet_name):
+                    results[sheet_name] = {'imported': 0, 'errors': 0, 'total_rows': 0, 'unchanged': True}
+                    continue
+                
+                # Rows dropped by the sheet's skip rules, by reason, and values stored as NULL, by column
+                skipped = {}
+                outliers = {}
+                if IMPORT_STREAMING and not revise_project_id:
+                    # Read, convert and insert the sheet chunk by chunk
+                    imported_count, error_count, rows_per_sec, total_rows, digest = stream_sheet(
+                        sheet_name, excel_file, db, project.id, user.id, on_progress=on_progress,
+                        skipped=skipped, outliers=outliers
+                    )
+                    fingerprints.record(sheet_name, digest, total_rows)
+                else:
+                    df = read_sheet(workbook, sheet_name, mapped_columns(sheet_name))
+                    digest = sheet_hash(df)
                     df = clean_dataframe(df)
+                    total_rows = len(df)
                     
-                    imported_count, error_count = import_sheet_data(sheet_name, df, project.id, user.id, db)
-                    
-                    results[sheet_name] = {
-                        'imported': imported_count,
-                        'errors': error_count,
-                        'total_rows': len(df)
-                    }
+                    if fingerprints.unchanged(sheet_name, digest):
+                        db.commit()
+                        results[sheet_name] = {'imported': 0, 'errors': 0, 'total_rows': total_rows, 'unchanged': True}
+                        continue
                     
-                    total_imported += imported_count
-                    total_errors += error_count
-                    
-                    # Commit after each sheet
-                    db.commit()
-                    
-                except Exception as e:
-                    results[sheet_name] = {
-                        'imported': 0,
-                        'errors': 0,
-                        'total_rows': 0,
-                        'error': str(e)
-                    }
-                    db.rollback()
-            
-            return jsonify({
-                'success': True,
-                'project_id': project.id,
-                'user_id': user.id,
-                'results': results,
-                'total_imported': total_imported,
-                'total_errors': total_errors
-            })
-            
-        except Exception as e:
-            db.rollback()
-            return jsonify({'error': str(e)})
-        finally:
-            db.close()
+                    if revise_project_id:
+                        # Write only the inserts, updates and deletes against the project's rows
+                        diff = revise_sheet(sheet_name, df, db, project.id, user.id, on_progress=on_progress)
+                        imported_count = diff['inserted'] + diff['updated']
+                        error_count = diff['errors']
+                        skipped = diff['skipped']
+                        outliers = diff['outliers']
+                        rows_per_sec = diff['rows_per_sec']
+                    else:
+                        imported_count, error_count, rows_per_sec = import_sheet_data(
+                            sheet_name, df, project.id, user.id, db, on_progress, skipped, outliers
+                        )
+                    fingerprints.record(sheet_name, digest, total_rows)
+                
+                results[sheet_name] = {
+                    'imported': imported_count,
+                    'errors': error_count,
+                    'outliers': outliers,
+                    'skipped': sum(skipped.values()),
+                    'skipped_rows': skipped,
+                    'total_rows': total_rows,
+                    'rows_per_sec': round(rows_per_sec)
+                }
+                
+                total_imported += imported_count
+                total_errors += error_count
+                total_skipped += sum(skipped.values())
+                
+                # Commit after each sheet
+                db.commit()
+                
+            except Exception as e:
+                results[sheet_name] = {
+                    'imported': 0,
+                    'errors': 0,
+                    'total_rows': 0,
+                    'error': str(e)
+                }
+                db.rollback()
+            finally:
+                if progress and sheet_name in results:
+                    result = results[sheet_name]
+                    if 'error' in result:
+                        status = 'failed'
+                    elif result.get('unsupported'):
+                        status = 'unsupported'
+                    elif result.get('unchanged'):
+                        status = 'unchanged'
+                    else:
+                        status = 'done'
+                    progress(sheet_name, position + 1, **dict(result, status=status))
+        
+        if progress:
+            progress(None, len(selected_sheets))
+        
+        # Only a complete import lets the next upload of this file be skipped
+        if not any(result.get('error') for result in results.values()):
+            record_import(db, project.id, user.id, file_name, file_hash)
+            db.commit()
+        
+        return {
+            'success': True,
+            'project_id': project.id,
+            'user_id': user.id,
+            'results': results,
+            'total_imported': total_imported,
+            'total_errors': total_errors,
+            'total_skipped': total_skipped
+        }
+        
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+@app.route('/import_excel', methods=['POST'])
+def import_excel():
+    """Queue an Excel import and return its job id straight away"""
+    try:
+        data = request.get_json()
+        selected_sheets = data.get('sheets', [])
+        revise_project_id = data.get('revise_project_id')
+        
+        if not selected_sheets:
+            return jsonify({'error': 'No sheets selected'})
+        
+        excel_file = r"C:\Users\navee\Downloads\Schlegel Accubid in Excel (1).xlsx"
+        
+        if not os.path.exists(excel_file):
+            return jsonify({'error': 'Excel file not found'})
+        
+        from src.jobs import submit_job
+        
+        job_id = submit_job(run_import, selected_sheets, excel_file, selected_sheets, revise_project_id)
+        
+        return jsonify({
+            'success': True,
+            'job_id': job_id,
+            'status_url': url_for('job_status', job_id=job_id),
+            'events_url': url_for('job_events', job_id=job_id)
+        })
         
     except Exception as e:
         return jsonify({'error': str(e)})
 
+@app.route('/jobs/<int:job_id>')
+def job_status(job_id):
+    """Poll the state and progress of an import job"""
+    from src.jobs import get_job
+    
+    job = get_job(job_id)
+    if job is None:
+        return jsonify({'error': f'Job {job_id} not found'}), 404
+    return jsonify(job)
+
+@app.route('/jobs/<int:job_id>/events')
+def job_events(job_id):
+    """
+    Stream a job's progress as server-sent events.
+    
+    An event is sent whenever the stored job state changes, ending with a
+    'done' event once it has succeeded or failed. A comment line keeps idle
+    connections open through proxies.
+    """
+    from src.jobs import get_job, SUCCEEDED, FAILED
+    
+    if get_job(job_id) is None:
+        return jsonify({'error': f'Job {job_id} not found'}), 404
+    
+    def events():
+        last = None
+        idle = 0.0
+        while True:
+            try:
+                job = get_job(job_id)
+            except Exception as e:
+                # The database can be briefly locked by a running import (SQLite)
+                app.logger.debug(f"Job {job_id} state not readable yet: {e}")
+                job = None
+            if job is None:
+                time.sleep(0.5)
+                continue
+            
+            payload = json.dumps(job, default=str)
+            finished = job['status'] in (SUCCEEDED, FAILED)
+            
+            if finished:
+                yield f"event: done\ndata: {payload}\n\n"
+                return
+            if payload != last:
+                last = payload
+                idle = 0.0
+                yield f"data: {payload}\n\n"
+            elif idle >= 15:
+                idle = 0.0
+                yield ": keep-alive\n\n"
+            
+            time.sleep(0.5)
+            idle += 0.5
+    
+    return Response(
+        stream_with_context(events()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+@app.route('/api/tables/<table_name>')
+def list_table(table_name):
+    """
+    One keyset page of users, projects or a project_* item table.
+    
+    Query parameters: cursor (the next_cursor of the previous page), limit,
+    and project_id to list a single project's items.
+    """
+    from src.database import SessionLocal
+    from src.listing import get_listing_table, list_page
+    
+    db = SessionLocal()
+    try:
+        table = get_listing_table(db.get_bind(), table_name)
+        page = list_page(
+            db, table,
+            cursor=request.args.get('cursor'),
+            limit=request.args.get('limit', type=int),
+            project_id=request.args.get('project_id', type=int)
+        )
+        page['next_url'] = None
+        if page['next_cursor']:
+            args = dict(request.args, cursor=page['next_cursor'])
+            page['next_url'] = url_for('list_table', table_name=table_name, **args)
+        return jsonify(page)
+    except KeyError as e:
+        return jsonify({'error': e.args[0]}), 404
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    finally:
+        db.close()
+
 if __name__ == '__main__':
     app.run(debug=True, host='0.0.0.0', port=5000) 
\ No newline at end of file
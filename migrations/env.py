@@ -84,6 +84,10 @@ def run_migrations_online() -> None:
         with context.begin_transaction():
             context.run_migrations()
 
+    # Servers embedding Alembic must not keep serving tables reflected before the migration
+    from src.table_cache import invalidate_table_cache
+    invalidate_table_cache()
+
 
 if context.is_offline_mode():
     run_migrations_offline()
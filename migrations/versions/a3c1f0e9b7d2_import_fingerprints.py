@@ -0,0 +1,74 @@
+"""import_fingerprints
+
+Revision ID: a3c1f0e9b7d2
+Revises: 2565bde4d4eb
+Create Date: 2026-10-17 09:12:44.318205
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a3c1f0e9b7d2'
+down_revision = '2565bde4d4eb'
+branch_labels = None
+depends_on = None
+
+# Tables written by the mapped sheet importers
+FINGERPRINTED_TABLES = [
+    'project_ext',
+    'project_dirlb',
+    'project_inclb',
+    'project_lbfac',
+    'project_lbesc',
+    'project_indlb',
+]
+
+
+def upgrade() -> None:
+    op.create_table('project_imports',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('project_id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('file_name', sa.String(length=255), nullable=True),
+    sa.Column('file_hash', sa.String(length=64), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['project_id'], ['projects.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_project_imports_id'), 'project_imports', ['id'], unique=False)
+    op.create_index(op.f('ix_project_imports_file_name'), 'project_imports', ['file_name'], unique=False)
+    op.create_index(op.f('ix_project_imports_file_hash'), 'project_imports', ['file_hash'], unique=False)
+
+    op.create_table('project_import_sheets',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('project_id', sa.Integer(), nullable=False),
+    sa.Column('sheet_name', sa.String(length=100), nullable=False),
+    sa.Column('file_hash', sa.String(length=64), nullable=False),
+    sa.Column('sheet_hash', sa.String(length=64), nullable=False),
+    sa.Column('row_count', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['project_id'], ['projects.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_project_import_sheets_id'), 'project_import_sheets', ['id'], unique=False)
+    op.create_index(op.f('ix_project_import_sheets_project_id'), 'project_import_sheets', ['project_id'], unique=False)
+
+    for table_name in FINGERPRINTED_TABLES:
+        op.add_column(table_name, sa.Column('row_hash', sa.String(length=32), nullable=True))
+
+
+def downgrade() -> None:
+    for table_name in FINGERPRINTED_TABLES:
+        op.drop_column(table_name, 'row_hash')
+
+    op.drop_index(op.f('ix_project_import_sheets_project_id'), table_name='project_import_sheets')
+    op.drop_index(op.f('ix_project_import_sheets_id'), table_name='project_import_sheets')
+    op.drop_table('project_import_sheets')
+    op.drop_index(op.f('ix_project_imports_file_hash'), table_name='project_imports')
+    op.drop_index(op.f('ix_project_imports_file_name'), table_name='project_imports')
+    op.drop_index(op.f('ix_project_imports_id'), table_name='project_imports')
+    op.drop_table('project_imports')
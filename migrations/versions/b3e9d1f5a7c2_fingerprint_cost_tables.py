@@ -0,0 +1,47 @@
+"""fingerprint_cost_tables
+
+Revision ID: b3e9d1f5a7c2
+Revises: f4c7a9d2b8e1
+Create Date: 2026-10-17 21:05:33.614820
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b3e9d1f5a7c2'
+down_revision = 'f4c7a9d2b8e1'
+branch_labels = None
+depends_on = None
+
+# Sheets now imported through the mapped path, which fingerprints every row
+FINGERPRINTED_TABLES = [
+    'project_subs',
+    'project_gnexp',
+    'project_eqpmt',
+    'project_qtmat',
+    'project_fnprc',
+]
+
+
+def has_row_hash(table_name):
+    """None if the table does not exist, else whether it already has row_hash"""
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table(table_name):
+        return None
+    return any(column['name'] == 'row_hash' for column in inspector.get_columns(table_name))
+
+
+def upgrade() -> None:
+    for table_name in FINGERPRINTED_TABLES:
+        # Tables the dynamic importer created may already have one
+        if has_row_hash(table_name) is False:
+            op.add_column(table_name, sa.Column('row_hash', sa.String(length=32), nullable=True))
+
+
+def downgrade() -> None:
+    for table_name in FINGERPRINTED_TABLES:
+        if has_row_hash(table_name):
+            with op.batch_alter_table(table_name) as batch_op:
+                batch_op.drop_column('row_hash')
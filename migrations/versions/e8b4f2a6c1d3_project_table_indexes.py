@@ -0,0 +1,57 @@
+"""project_table_indexes
+
+Revision ID: e8b4f2a6c1d3
+Revises: d5a8c3e1f7b9
+Create Date: 2026-10-17 19:21:40.118305
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e8b4f2a6c1d3'
+down_revision = 'd5a8c3e1f7b9'
+branch_labels = None
+depends_on = None
+
+# Bookkeeping tables that are not per-project item tables
+SKIP_TABLES = ('project_imports', 'project_import_sheets')
+
+# Kept in step with LOOKUP_COLUMNS and TEXT_INDEX_LENGTH in src/models.py
+LOOKUP_COLUMNS = ('catalog_number', 'code')
+TEXT_INDEX_LENGTH = 100
+
+
+def project_tables():
+    """Every project_* item table in the database, including ones built by the dynamic importer"""
+    inspector = sa.inspect(op.get_bind())
+    for table_name in inspector.get_table_names():
+        if not table_name.startswith('project_') or table_name in SKIP_TABLES:
+            continue
+        columns = {column['name']: column['type'] for column in inspector.get_columns(table_name)}
+        if 'project_id' in columns and 'id' in columns:
+            existing = {index['name'] for index in inspector.get_indexes(table_name)}
+            yield table_name, columns, existing
+
+
+def upgrade() -> None:
+    for table_name, columns, existing in project_tables():
+        name = f'ix_{table_name}_project_id_id'
+        if name not in existing:
+            op.create_index(name, table_name, ['project_id', 'id'], unique=False)
+
+        for column in LOOKUP_COLUMNS:
+            name = f'ix_{table_name}_{column}'
+            if column not in columns or name in existing:
+                continue
+            options = {'mysql_length': TEXT_INDEX_LENGTH} if isinstance(columns[column], sa.Text) else {}
+            op.create_index(name, table_name, [column], unique=False, **options)
+
+
+def downgrade() -> None:
+    for table_name, columns, existing in project_tables():
+        for column in ('project_id_id',) + LOOKUP_COLUMNS:
+            name = f'ix_{table_name}_{column}'
+            if name in existing:
+                op.drop_index(name, table_name=table_name)
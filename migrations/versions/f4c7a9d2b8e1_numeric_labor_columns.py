@@ -0,0 +1,155 @@
+"""numeric_labor_columns
+
+Revision ID: f4c7a9d2b8e1
+Revises: e8b4f2a6c1d3
+Create Date: 2026-10-17 19:40:12.503917
+
+"""
+import logging
+import re
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f4c7a9d2b8e1'
+down_revision = 'e8b4f2a6c1d3'
+branch_labels = None
+depends_on = None
+
+logger = logging.getLogger('alembic.runtime.migration')
+
+LABOR_COLUMNS = ['hours', 'rate', 'sub_total', 'brdn_total', 'frng_total', 'total', 'full_rate']
+
+# Labor tables and the Text columns that become Float. project_indlb and
+# project_lbfac were created with DECIMAL(10, 2) amounts and stay exact.
+NUMERIC_COLUMNS = {
+    'project_dirlb': LABOR_COLUMNS,
+    'project_inclb': LABOR_COLUMNS,
+    'project_lbesc': ['total'],
+}
+
+# Rows read and rewritten per statement while converting values
+BATCH_SIZE = 1000
+
+# Unparseable values logged individually per table; the rest are only counted
+MAX_REPORTED = 20
+
+NUMBER_RE = re.compile(r'^[+-]?(\d+\.?\d*|\.\d+)([eE][+-]?\d+)?$')
+
+
+def parse_number(value):
+    """
+    Float for a stored string, None if it is blank.
+
+    Accepts thousands separators, a leading currency sign and accounting
+    negatives such as (1,234.50); raises ValueError for anything else.
+    """
+    text = value.strip()
+    if text == '' or text.lower() in ('nan', 'none'):
+        return None
+    negative = text.startswith('(') and text.endswith(')')
+    if negative:
+        text = text[1:-1].strip()
+    text = text.lstrip('$').replace(',', '').strip()
+    if not NUMBER_RE.match(text):
+        raise ValueError(value)
+    number = float(text)
+    return -number if negative else number
+
+
+def existing_columns(table_name, columns):
+    """The listed columns a table has, empty if the table does not exist"""
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table(table_name):
+        return []
+    present = {column['name'] for column in inspector.get_columns(table_name)}
+    return [column for column in columns if column in present]
+
+
+def normalise_values(table_name, columns):
+    """
+    Rewrite every value as a plain number string in batches, nulling the
+    unparseable ones, so the column can be cast to Float afterwards.
+
+    Returns the number of unparseable values found.
+    """
+    bind = op.get_bind()
+    table = sa.table(table_name, sa.column('id'), *[sa.column(column) for column in columns])
+    update = (
+        table.update()
+        .where(table.c.id == sa.bindparam('_id'))
+        .values({column: sa.bindparam(f'_{column}') for column in columns})
+    )
+
+    unparseable = 0
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(table).where(table.c.id > last_id).order_by(table.c.id).limit(BATCH_SIZE)
+        ).mappings().all()
+        if not rows:
+            break
+        last_id = rows[-1]['id']
+
+        changes = []
+        for row in rows:
+            values = {}
+            for column in columns:
+                value = row[column]
+                if value is None:
+                    values[f'_{column}'] = None
+                    continue
+                try:
+                    number = parse_number(str(value))
+                    values[f'_{column}'] = None if number is None else repr(number)
+                except ValueError:
+                    unparseable += 1
+                    if unparseable <= MAX_REPORTED:
+                        logger.warning(f"{table_name}.{column} id={row['id']}: cannot convert {value!r}, set to NULL")
+                    values[f'_{column}'] = None
+            if any(values[f'_{column}'] != row[column] for column in columns):
+                changes.append({'_id': row['id'], **values})
+
+        if changes:
+            bind.execute(update, changes)
+
+    return unparseable
+
+
+def upgrade() -> None:
+    for table_name, columns in NUMERIC_COLUMNS.items():
+        columns = existing_columns(table_name, columns)
+        if not columns:
+            continue
+
+        unparseable = normalise_values(table_name, columns)
+        if unparseable:
+            logger.warning(f"{table_name}: {unparseable} unparseable values set to NULL")
+
+        with op.batch_alter_table(table_name) as batch_op:
+            for column in columns:
+                batch_op.alter_column(
+                    column,
+                    existing_type=sa.Text(),
+                    type_=sa.Float(),
+                    existing_nullable=True,
+                    postgresql_using=f'{column}::double precision'
+                )
+
+
+def downgrade() -> None:
+    for table_name, columns in NUMERIC_COLUMNS.items():
+        columns = existing_columns(table_name, columns)
+        if not columns:
+            continue
+
+        with op.batch_alter_table(table_name) as batch_op:
+            for column in columns:
+                batch_op.alter_column(
+                    column,
+                    existing_type=sa.Float(),
+                    type_=sa.Text(),
+                    existing_nullable=True
+                )
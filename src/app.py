@@ -1,8 +1,15 @@
 import streamlit as st
 from dotenv import load_dotenv
+import hashlib
 import os
-from database import get_db, engine
-from models import Base, User, Project
+import sys
+
+# Import the package the same way the importers do, so models load only once
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.database import get_db, engine
+from src.models import Base, User, Project
+from src.listing import get_listing_table, is_item_table, list_page, invalidate_counts, LISTING_PAGE_SIZE, LISTING_MAX_PAGE_SIZE
 from sqlalchemy.orm import Session
 
 load_dotenv()  # Loads variables from .env
@@ -10,8 +17,102 @@ load_dotenv()  # Loads variables from .env
 secret_key = os.getenv("SECRET_KEY")
 api_url = os.getenv("API_URL")
 
+# Seconds the user and project listings are served from cache
+LISTING_CACHE_TTL = int(os.getenv("LISTING_CACHE_TTL", "30"))
+
+def schema_fingerprint(metadata):
+    """Hash of every table, column and index the models declare"""
+    digest = hashlib.sha256()
+    for table in metadata.sorted_tables:
+        digest.update(table.name.encode())
+        for column in table.columns:
+            digest.update(f"{column.name}:{column.type}:{column.nullable}".encode())
+        for index in sorted(table.indexes, key=lambda index: index.name or ""):
+            digest.update(f"{index.name}".encode())
+    return digest.hexdigest()
+
+@st.cache_resource(show_spinner=False)
+def bootstrap_schema(fingerprint):
+    """
+    Create missing tables once per process and model version.
+    
+    Streamlit re-runs this module on every interaction; the fingerprint
+    key means create_all only runs again when the models change.
+    """
+    Base.metadata.create_all(bind=engine)
+    return fingerprint
+
+# Display labels for the user and project listings
+USER_LABELS = {
+    "id": "ID", "username": "Username", "email": "Email",
+    "full_name": "Full Name", "role": "Role", "is_active": "Active", "created_at": "Created"
+}
+PROJECT_LABELS = {
+    "id": "ID", "name": "Name", "description": "Description",
+    "status": "Status", "created_at": "Created"
+}
+
+@st.cache_data(ttl=LISTING_CACHE_TTL, show_spinner=False)
+def load_page(table_name, cursor=None, limit=None, project_id=None):
+    """One keyset page of a listing, cached for LISTING_CACHE_TTL seconds"""
+    db = next(get_db())
+    try:
+        table = get_listing_table(db.get_bind(), table_name)
+        return list_page(db, table, cursor, limit, project_id)
+    finally:
+        db.close()
+
+@st.cache_data(ttl=LISTING_CACHE_TTL, show_spinner=False)
+def load_item_tables():
+    """Names of the project_* tables that can be browsed"""
+    from sqlalchemy import inspect
+    return sorted(name for name in inspect(engine).get_table_names() if is_item_table(name))
+
+def format_row(row, labels=None):
+    """Listing row with display labels and readable timestamps"""
+    if labels:
+        row = {label: row.get(column) for column, label in labels.items()}
+    return {
+        key: value.strftime("%Y-%m-%d %H:%M:%S") if hasattr(value, "strftime") else ("N/A" if value is None else value)
+        for key, value in row.items()
+    }
+
+def show_page(key, table_name, labels=None, project_id=None, limit=None, empty_message="No rows found."):
+    """
+    Render one page of a listing with previous and next buttons.
+    
+    The cursors of the pages already visited are kept in session state
+    under key, so going back re-reads the cached earlier page.
+    """
+    state_key = f"cursors_{key}"
+    scope = (table_name, project_id, limit)
+    if st.session_state.get(f"{state_key}_scope") != scope:
+        st.session_state[state_key] = [None]
+        st.session_state[f"{state_key}_scope"] = scope
+    cursors = st.session_state[state_key]
+    
+    page = load_page(table_name, cursors[-1], limit, project_id)
+    if not page["items"]:
+        st.info(empty_message)
+        return
+    
+    st.dataframe([format_row(row, labels) for row in page["items"]])
+    
+    first = (len(cursors) - 1) * page["page_size"] + 1
+    st.caption(f"Rows {first}-{first + len(page['items']) - 1} of {page['total']}")
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        if st.button("◀ Previous", key=f"prev_{key}", disabled=len(cursors) == 1):
+            cursors.pop()
+            st.rerun()
+    with col2:
+        if st.button("Next ▶", key=f"next_{key}", disabled=page["next_cursor"] is None):
+            cursors.append(page["next_cursor"])
+            st.rerun()
+
 # Create database tables
-Base.metadata.create_all(bind=engine)
+bootstrap_schema(schema_fingerprint(Base.metadata))
 
 def main():
     st.title("Database Migration Demo App")
@@ -44,6 +145,8 @@ def main():
                     )
                     db.add(new_user)
                     db.commit()
+                    load_page.clear()
+                    invalidate_counts("users")
                     st.success(f"User {username} added successfully!")
                 except Exception as e:
                     st.error(f"Error adding user: {e}")
@@ -73,6 +176,8 @@ def main():
                     )
                     db.add(new_project)
                     db.commit()
+                    load_page.clear()
+                    invalidate_counts("projects")
                     st.success(f"Project {project_name} added successfully!")
                 except Exception as e:
                     st.error(f"Error adding project: {e}")
@@ -87,47 +192,30 @@ def main():
     
     # Display users
     st.subheader("Users")
-    db = next(get_db())
-    try:
-        users = db.query(User).all()
-        if users:
-            user_data = []
-            for user in users:
-                user_data.append({
-                    "ID": user.id,
-                    "Username": user.username,
-                    "Email": user.email,
-                    "Full Name": user.full_name,
-                    "Role": user.role,
-                    "Active": user.is_active,
-                    "Created": user.created_at.strftime("%Y-%m-%d %H:%M:%S") if user.created_at else "N/A"
-                })
-            st.dataframe(user_data)
-        else:
-            st.info("No users found in database.")
-    finally:
-        db.close()
+    page_size = st.sidebar.number_input(
+        "Rows per page", min_value=1, max_value=LISTING_MAX_PAGE_SIZE, value=LISTING_PAGE_SIZE
+    )
+    show_page("users", "users", USER_LABELS, limit=page_size,
+              empty_message="No users found in database.")
     
     # Display projects
     st.subheader("Projects")
-    db = next(get_db())
-    try:
-        projects = db.query(Project).all()
-        if projects:
-            project_data = []
-            for project in projects:
-                project_data.append({
-                    "ID": project.id,
-                    "Name": project.name,
-                    "Description": project.description,
-                    "Status": project.status,
-                    "Created": project.created_at.strftime("%Y-%m-%d %H:%M:%S") if project.created_at else "N/A"
-                })
-            st.dataframe(project_data)
-        else:
-            st.info("No projects found in database.")
-    finally:
-        db.close()
+    show_page("projects", "projects", PROJECT_LABELS, limit=page_size,
+              empty_message="No projects found in database.")
+    
+    # Browse the imported rows of one project
+    st.subheader("Project Items")
+    item_tables = load_item_tables()
+    if item_tables:
+        col1, col2 = st.columns(2)
+        with col1:
+            item_table = st.selectbox("Table", item_tables)
+        with col2:
+            item_project = st.number_input("Project ID (0 for all)", min_value=0, step=1)
+        show_page("items", item_table, project_id=int(item_project) or None, limit=page_size,
+                  empty_message="No rows found for this project.")
+    else:
+        st.info("No project tables found in database.")
     
     # Environment variables display
     st.sidebar.header("Environment Variables")
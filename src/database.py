@@ -136,6 +136,9 @@ def init_db():
     try:
         Base.metadata.create_all(bind=engine)
         logger.info("Database tables created successfully")
+        
+        from src.table_cache import invalidate_table_cache
+        invalidate_table_cache()
         return True
     except Exception as e:
         logger.error(f"Failed to create database tables: {e}")
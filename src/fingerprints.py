@@ -0,0 +1,167 @@
+"""
+Content fingerprints for idempotent re-imports
+
+Every import records the hash of the source workbook and of each sheet it
+wrote, and every mapped row carries a row_hash of its values. Uploading
+the same workbook again is then detected without reading a single sheet,
+unchanged sheets are skipped after one hash, and in a changed sheet only
+the rows whose fingerprint is new are written; rows that disappeared are
+deleted.
+"""
+
+import hashlib
+import logging
+from collections import defaultdict
+
+import pandas as pd
+from sqlalchemy import select
+
+logger = logging.getLogger(__name__)
+
+# Column holding the per-row fingerprint in project tables
+ROW_HASH = 'row_hash'
+
+
+def row_hash(values):
+    """Fingerprint of one converted row"""
+    return hashlib.blake2b(repr(tuple(values)).encode(), digest_size=16).hexdigest()
+
+
+def sheet_hash(df):
+    """Fingerprint of a parsed sheet: its headers and every cell, hashed per row"""
+    hasher = SheetHasher()
+    hasher.update(df)
+    return hasher.hexdigest()
+
+
+class SheetHasher:
+    """
+    sheet_hash built up chunk by chunk, for sheets that are streamed.
+
+    Rows are hashed one by one, so feeding a sheet's chunks in order gives
+    the same hash as the whole sheet, as long as the chunks were parsed to
+    the same dtypes.
+    """
+
+    def __init__(self):
+        self._digest = None
+
+    def update(self, df):
+        if self._digest is None:
+            self._digest = hashlib.sha256(repr(list(df.columns)).encode())
+        self._digest.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+
+    def hexdigest(self):
+        if self._digest is None:
+            return sheet_hash(pd.DataFrame())
+        return self._digest.hexdigest()
+
+
+def find_project_id(db, file_hash):
+    """
+    Project this exact workbook was imported into before, if any.
+
+    Only identical content matches: exports routinely share a file name,
+    so a different workbook always gets a new project. Applying a revised
+    bid to an existing project goes through revise mode instead.
+    """
+    from src.models import ProjectImport
+
+    previous = (
+        db.query(ProjectImport)
+        .filter(ProjectImport.file_hash == file_hash)
+        .order_by(ProjectImport.id.desc())
+        .first()
+    )
+    return previous.project_id if previous else None
+
+
+def record_import(db, project_id, user_id, file_name, file_hash):
+    """Log a finished import of a workbook into a project"""
+    from src.models import ProjectImport
+
+    db.add(ProjectImport(project_id=project_id, user_id=user_id, file_name=file_name, file_hash=file_hash))
+
+
+class SheetFingerprints:
+    """The sheet hashes last imported into a project"""
+
+    def __init__(self, db, project_id, file_hash):
+        from src.models import ProjectImportSheet
+
+        self.db = db
+        self.project_id = project_id
+        self.file_hash = file_hash
+        self._records = {
+            record.sheet_name: record
+            for record in db.query(ProjectImportSheet).filter(ProjectImportSheet.project_id == project_id)
+        }
+
+    def unchanged_file(self, sheet_name):
+        """True if the sheet was already imported from this exact workbook"""
+        record = self._records.get(sheet_name)
+        return record is not None and record.file_hash == self.file_hash
+
+    def unchanged(self, sheet_name, digest):
+        """True if the sheet content matches what was last imported"""
+        record = self._records.get(sheet_name)
+        if record is None or record.sheet_hash != digest:
+            return False
+        record.file_hash = self.file_hash
+        return True
+
+    def record(self, sheet_name, digest, row_count):
+        """Remember the content a sheet was just imported with"""
+        from src.models import ProjectImportSheet
+
+        record = self._records.get(sheet_name)
+        if record is None:
+            record = ProjectImportSheet(project_id=self.project_id, sheet_name=sheet_name)
+            self.db.add(record)
+            self._records[sheet_name] = record
+        record.file_hash = self.file_hash
+        record.sheet_hash = digest
+        record.row_count = row_count
+
+
+class RowSync:
+    """
+    Match incoming row fingerprints against the rows a project already has.
+
+    Rows whose fingerprint is claimed are left untouched; rows nobody
+    claimed are deleted by delete_stale(). Tables without a row_hash
+    column are never matched, so every row is inserted as before.
+    """
+
+    def __init__(self, db, table, project_id):
+        self.db = db
+        self.table = table
+        self.enabled = ROW_HASH in table.columns
+        self.unchanged = 0
+        self._existing = defaultdict(list)
+        if self.enabled:
+            rows = db.execute(
+                select(table.c.id, table.c[ROW_HASH]).where(table.c.project_id == project_id)
+            )
+            for row_id, fingerprint in rows:
+                self._existing[fingerprint].append(row_id)
+
+    def claim(self, fingerprint):
+        """True if an identical row already exists and is kept"""
+        ids = self._existing.get(fingerprint)
+        if not ids:
+            return False
+        ids.pop()
+        self.unchanged += 1
+        return True
+
+    def delete_stale(self, batch_size=None):
+        """Delete the existing rows no incoming row matched; returns how many"""
+        from src.ingest import delete_rows
+
+        stale = [row_id for ids in self._existing.values() for row_id in ids]
+        delete_rows(self.db, self.table, stale, batch_size)
+        self._existing.clear()
+        if self.enabled:
+            logger.info(f"{self.table.name}: {self.unchanged} rows unchanged, {len(stale)} stale rows deleted")
+        return len(stale)
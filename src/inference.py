@@ -0,0 +1,126 @@
+"""
+Column type inference for sheets imported into dynamic tables
+
+Sheets without a model mapping used to land in all-Text tables. Before
+such a table is created, a sample of each column is checked against
+the converter kinds from most to least specific. The column takes the
+first kind that almost all of its sampled values fit. The few values
+that do not fit are outliers: they are reported and stored as NULL
+rather than turning the whole column into text.
+"""
+
+import os
+from datetime import date
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import BigInteger, Boolean, DateTime, Float, Integer, Numeric, Text
+
+from src.ingest import BOOLEAN, DATETIME, FLOAT, INTEGER, STRING, coerce_column, parse_numbers
+
+# Rows sampled per column when inferring its type
+INFERENCE_SAMPLE_ROWS = int(os.getenv("INFERENCE_SAMPLE_ROWS", "1000"))
+
+# Share of sampled values allowed not to fit a column's inferred kind
+INFERENCE_OUTLIER_RATIO = float(os.getenv("INFERENCE_OUTLIER_RATIO", "0.01"))
+
+# Most specific first; STRING always fits
+CANDIDATE_KINDS = (BOOLEAN, INTEGER, FLOAT, DATETIME)
+
+SQL_TYPES = {
+    INTEGER: BigInteger,
+    FLOAT: Float,
+    DATETIME: DateTime,
+    BOOLEAN: Boolean,
+    STRING: Text,
+}
+
+
+def sample_rows(df, size=None):
+    """
+    Up to size rows spread evenly over the frame, always including the
+    first and last ones, so values that only appear further down are seen.
+    """
+    size = size or INFERENCE_SAMPLE_ROWS
+    if len(df) <= size:
+        return df
+    positions = np.unique(np.linspace(0, len(df) - 1, size).astype(int))
+    return df.iloc[positions]
+
+
+def infer_kind(series, max_outliers=None):
+    """Converter kind for a column sample; STRING if no narrower kind fits"""
+    present = series.dropna()
+    if present.empty:
+        return STRING
+
+    if max_outliers is None:
+        max_outliers = int(len(present) * INFERENCE_OUTLIER_RATIO)
+
+    # Typed pandas columns need no trial conversion
+    if pd.api.types.is_bool_dtype(present):
+        return BOOLEAN
+    if pd.api.types.is_datetime64_any_dtype(present):
+        return DATETIME
+
+    text = present.astype(str)
+    numeric = pd.to_numeric(present, errors='coerce').notna()
+    is_bool = present.map(lambda value: isinstance(value, (bool, np.bool_)))
+    # Zero-padded codes such as 007 are text, whatever they look like
+    padded = text.str.match(r'^\s*[+-]?0\d').any()
+
+    for kind in CANDIDATE_KINDS:
+        # Numbers that happen to be 0/1 are integers, not booleans
+        if kind == BOOLEAN and (numeric & ~is_bool).any():
+            continue
+        if kind in (INTEGER, FLOAT) and padded:
+            continue
+        # Text only counts as a date if Excel stored a real date somewhere in the column
+        if kind == DATETIME and not present.map(lambda value: isinstance(value, (date, np.datetime64))).any():
+            continue
+        _, bad = coerce_column(present, kind)
+        if bad.sum() > max_outliers:
+            continue
+        # Fractions are never integer outliers: the column is FLOAT instead
+        if kind == INTEGER and has_fractions(present):
+            continue
+        return kind
+    return STRING
+
+
+def has_fractions(series):
+    """True if any numeric value in the series is not a whole number"""
+    numbers, _ = parse_numbers(series)
+    return bool((numbers.notna() & (numbers % 1 != 0)).any())
+
+
+def infer_kinds(df, columns=None, size=None):
+    """Inferred kind per header, from one shared sample of the sheet's rows"""
+    sample = sample_rows(df, size)
+    columns = df.columns if columns is None else columns
+    kinds = {}
+    for column in columns:
+        kind = infer_kind(sample[column])
+        # A fraction outside the sample would otherwise be lost as an outlier
+        if kind == INTEGER and has_fractions(df[column]):
+            kind = FLOAT
+        kinds[column] = kind
+    return kinds
+
+
+def sql_type(kind):
+    """SQLAlchemy type a dynamic table column of this kind is created with"""
+    return SQL_TYPES.get(kind, Text)()
+
+
+def kind_for_type(column_type):
+    """Converter kind for an existing table column, so reflected tables keep their types"""
+    if isinstance(column_type, Boolean):
+        return BOOLEAN
+    if isinstance(column_type, Integer):
+        return INTEGER
+    if isinstance(column_type, (Float, Numeric)):
+        return FLOAT
+    if isinstance(column_type, DateTime):
+        return DATETIME
+    return STRING
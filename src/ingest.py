@@ -0,0 +1,854 @@
+"""
+Shared ingest engine for Schlegel Accubid Excel sheets
+
+Column mapping, null handling and type coercion are done as whole-column
+pandas operations; the importers only receive ready-made row dicts.
+"""
+
+import logging
+import os
+import re
+import time
+from collections import defaultdict
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Rows sent per executemany batch by the bulk insert path
+BATCH_SIZE = int(os.getenv("IMPORT_BATCH_SIZE", "1000"))
+
+# Read sheets with the streaming reader instead of whole DataFrames
+IMPORT_STREAMING = os.getenv("IMPORT_STREAMING", "false").lower() == "true"
+
+# Example cells kept per column when reporting values stored as NULL
+MAX_OUTLIER_EXAMPLES = 5
+
+# Column kinds understood by the converter
+FLOAT = 'float'
+STRING = 'string'
+DATETIME = 'datetime'
+INTEGER = 'integer'
+BOOLEAN = 'boolean'
+
+# Stripped from number strings: currency, thousands separators, percent,
+# accounting parentheses and spaces
+NUMBER_DECORATION_RE = re.compile(r'[()$€£,%\s]')
+
+# Accubid price units (each, per hundred, per thousand) after a number
+PRICE_UNIT_RE = re.compile(r'(?<=[\d.])[ECMecm]$')
+
+# Excel stores dates as days since 1899-12-30, which is exact from serial
+# 61 (1900-03-01) on; below that Excel's phantom 1900-02-29 puts every
+# serial a day off. Serials are read as dates only from 1900-03-01 up to
+# the last full day datetime64[ns] can hold (2262-04-10); anything outside
+# that range is not a date
+EXCEL_EPOCH = '1899-12-30'
+EXCEL_SERIAL_MIN = 61
+EXCEL_SERIAL_MAX = 132319
+
+# Spellings a BOOLEAN cell may use, after str().strip().lower()
+BOOLEAN_VALUES = {
+    'true': True, 'false': False, 'yes': True, 'no': False, 'y': True, 'n': False,
+    '1': True, '0': False, '1.0': True, '0.0': False,
+}
+
+# Kinds a SHEET_MAPPINGS column may declare
+KINDS = (FLOAT, STRING, DATETIME, INTEGER, BOOLEAN)
+
+# Accubid sheet -> model, key column, revision match key and header -> (column, kind, default);
+# each entry is compiled into a SheetConverter when this module is imported
+SHEET_MAPPINGS = {
+    'Ext': {
+        'model': 'ProjectItem',
+        'key': 'Description',
+        'match': [
+            'catalog_number', 'description',
+            'sort_code_1', 'sort_code_2', 'sort_code_3', 'sort_code_4',
+            'sort_code_5', 'sort_code_6', 'sort_code_7', 'sort_code_8',
+        ],
+        'columns': {
+            'Description': ('description', STRING, None),
+            'Quantity': ('quantity', FLOAT, 1.0),
+            'Date': ('date', DATETIME, None),
+            'Trade Price': ('trade_price', FLOAT, None),
+            'Price Unit': ('price_unit', STRING, None),
+            'Disc %': ('discount_percent', FLOAT, 0.0),
+            'Link Price': ('link_price', FLOAT, None),
+            'Cost Adj %': ('cost_adjustment_percent', FLOAT, 0.0),
+            'Net Cost': ('net_cost', FLOAT, None),
+            'DB Labor': ('db_labor', FLOAT, None),
+            'Labor': ('labor', FLOAT, None),
+            'Labor Unit': ('labor_unit', STRING, None),
+            'Lab Adj %': ('labor_adjustment_percent', FLOAT, 0.0),
+            'Total Material': ('total_material', FLOAT, None),
+            'Total Hours': ('total_hours', FLOAT, None),
+            'Material Condition': ('material_condition', STRING, None),
+            'Labor Condition': ('labor_condition', STRING, None),
+            'Weight': ('weight', FLOAT, None),
+            'Weight Unit': ('weight_unit', STRING, None),
+            'Total Weight': ('total_weight', FLOAT, None),
+            'Manufacturer Name': ('manufacturer_name', STRING, None),
+            'Catalog Number': ('catalog_number', STRING, None),
+            'Price Code': ('price_code', STRING, None),
+            'Reference': ('reference', STRING, None),
+            'Supplier Name': ('supplier_name', STRING, None),
+            'Supplier Code': ('supplier_code', STRING, None),
+            'Sort Code 1': ('sort_code_1', STRING, None),
+            'Sort Code 2': ('sort_code_2', STRING, None),
+            'Sort Code 3': ('sort_code_3', STRING, None),
+            'Sort Code 4': ('sort_code_4', STRING, None),
+            'Sort Code 5': ('sort_code_5', STRING, None),
+            'Sort Code 6': ('sort_code_6', STRING, None),
+            'Sort Code 7': ('sort_code_7', STRING, None),
+            'Sort Code 8': ('sort_code_8', STRING, None),
+            'Quick Takeoff Code': ('quick_takeoff_code', STRING, None),
+        },
+    },
+    'DirLb': {
+        'model': 'ProjectDirlib',
+        'key': 'Labor Type',
+        'match': ['labor_type', 'code'],
+        'columns': {
+            'Labor Type': ('labor_type', STRING, None),
+            'Crew': ('crew', STRING, None),
+            'Hours': ('hours', FLOAT, None),
+            'Rate $': ('rate', FLOAT, None),
+            'SubTotal': ('sub_total', FLOAT, None),
+            'Brdn %': ('brdn', STRING, None),
+            'Frng $': ('frng', STRING, None),
+            'Brdn Tot.': ('brdn_total', FLOAT, None),
+            'Frng Tot.': ('frng_total', FLOAT, None),
+            'Total': ('total', FLOAT, None),
+            'Full Rate': ('full_rate', FLOAT, None),
+            'Code': ('code', STRING, None),
+            'Type': ('type', STRING, None),
+        },
+    },
+    'IncLb': {
+        'model': 'ProjectInclb',
+        'key': 'Incidental Labor',
+        'match': ['incidental_labor', 'code'],
+        'columns': {
+            'Incidental Labor': ('incidental_labor', STRING, None),
+            'Hours': ('hours', FLOAT, None),
+            'Rate $': ('rate', FLOAT, None),
+            'SubTotal': ('sub_total', FLOAT, None),
+            'Brdn %': ('brdn', STRING, None),
+            'Frng $': ('frng', STRING, None),
+            'Brdn Tot.': ('brdn_total', FLOAT, None),
+            'Frng Tot.': ('frng_total', FLOAT, None),
+            'Total': ('total', FLOAT, None),
+            'Full Rate': ('full_rate', FLOAT, None),
+            'Code': ('code', STRING, None),
+            'Type': ('type', STRING, None),
+        },
+    },
+    'LbFac': {
+        'model': 'ProjectLaborFactoring',
+        'key': 'Labor Factoring',
+        'match': ['labor_factoring', 'code'],
+        'columns': {
+            'Labor Factoring': ('labor_factoring', STRING, None),
+            'Factor': ('factor', FLOAT, None),
+            '% of Direct Hrs': ('direct_hours_percentage', FLOAT, None),
+            'Hours': ('hours', FLOAT, None),
+            'Rate $': ('rate', FLOAT, None),
+            'SubTotal': ('subtotal', FLOAT, None),
+            'Brdn %': ('burden_percentage', FLOAT, None),
+            'Frng $': ('fringe_amount', FLOAT, None),
+            'Brdn Tot.': ('burden_total', FLOAT, None),
+            'Frng Tot.': ('fringe_total', FLOAT, None),
+            'Total': ('total', FLOAT, None),
+            'Full Rate': ('full_rate', FLOAT, None),
+            'Code': ('code', STRING, None),
+            'Type': ('type', STRING, None),
+        },
+    },
+    'LbEsc': {
+        'model': 'ProjectLbfac',  # ProjectLbfac is mapped to project_lbesc
+        'key': 'Escalation Period',
+        'match': ['escalation_period', 'code'],
+        'columns': {
+            'Escalation Period': ('escalation_period', STRING, None),
+            'Description': ('description', STRING, None),
+            '% of Contract': ('percent_of_contract', STRING, None),
+            'Labor Hours': ('labor_hours', STRING, None),
+            'Escalation %': ('escalation_percent', STRING, None),
+            'Escalation $': ('escalation_amount', STRING, None),
+            'Financing %': ('financing_percent', STRING, None),
+            'Total': ('total', FLOAT, None),
+            'Code': ('code', STRING, None),
+            'Type': ('type', STRING, None),
+        },
+    },
+    'IndLb': {
+        'model': 'ProjectIndlb',
+        'key': 'Indirect Labor',
+        'match': ['indirect_labor', 'code'],
+        'columns': {
+            'Indirect Labor': ('indirect_labor', STRING, None),
+            'Lab %': ('labor_percentage', FLOAT, None),
+            'Hours': ('hours', FLOAT, None),
+            'Rate $': ('rate', FLOAT, None),
+            'SubTotal': ('subtotal', FLOAT, None),
+            'Brdn %': ('burden_percentage', FLOAT, None),
+            'Frng $': ('fringe_amount', FLOAT, None),
+            'Brdn Tot.': ('burden_total', FLOAT, None),
+            'Frng Tot.': ('fringe_total', FLOAT, None),
+            'Total': ('total', FLOAT, None),
+            'Full Rate': ('full_rate', FLOAT, None),
+            'Code': ('code', STRING, None),
+            'Type': ('type', STRING, None),
+        },
+    },
+    'Subs': {
+        'model': 'ProjectSubs',
+        'key': 'Subcontractor',
+        'match': ['subcontractor', 'code'],
+        'columns': {
+            'Subcontractor': ('subcontractor', STRING, None),
+            'Alarm': ('alarm', STRING, None),
+            'Cost': ('cost', STRING, None),
+            'Adj %': ('adjustment_percent', STRING, None),
+            'Adj $': ('adjustment_amount', STRING, None),
+            'Adjusted Cost': ('adjusted_cost', STRING, None),
+            'Tax %': ('tax_percent', STRING, None),
+            'OH %': ('overhead_percent', STRING, None),
+            'Markup %': ('markup_percent', STRING, None),
+            'Total': ('total', STRING, None),
+            'Vendor': ('vendor', STRING, None),
+            'Notes': ('notes', STRING, None),
+            'Code': ('code', STRING, None),
+            'Type': ('type', STRING, None),
+        },
+    },
+    'GnExp': {
+        'model': 'ProjectGnexp',
+        'key': 'General Expenses',
+        'match': ['general_expenses', 'code'],
+        'columns': {
+            'General Expenses': ('general_expenses', STRING, None),
+            'Alarm': ('alarm', STRING, None),
+            'Quantity': ('quantity', STRING, None),
+            'Field': ('field', STRING, None),
+            'Duration': ('duration', STRING, None),
+            'Cost/Unit': ('cost_per_unit', STRING, None),
+            'Total Cost': ('total_cost', STRING, None),
+            'Tax %': ('tax_percent', STRING, None),
+            'OH %': ('overhead_percent', STRING, None),
+            'Markup %': ('markup_percent', STRING, None),
+            'Total': ('total', STRING, None),
+            'Notes': ('notes', STRING, None),
+            'Code': ('code', STRING, None),
+            'Type': ('type', STRING, None),
+        },
+    },
+    'Eqpmt': {
+        'model': 'ProjectEqpmt',
+        'key': 'Equipment',
+        'match': ['equipment', 'code'],
+        'columns': {
+            'Equipment': ('equipment', STRING, None),
+            'Alarm': ('alarm', STRING, None),
+            'Quantity': ('quantity', STRING, None),
+            'Field': ('field', STRING, None),
+            'Duration': ('duration', STRING, None),
+            'Cost/Unit': ('cost_per_unit', STRING, None),
+            'Total Cost': ('total_cost', STRING, None),
+            'Tax %': ('tax_percent', STRING, None),
+            'OH %': ('overhead_percent', STRING, None),
+            'Markup %': ('markup_percent', STRING, None),
+            'Total': ('total', STRING, None),
+            'Notes': ('notes', STRING, None),
+            'Code': ('code', STRING, None),
+            'Type': ('type', STRING, None),
+        },
+    },
+    'QtMat': {
+        'model': 'ProjectQtmat',
+        'key': 'Quoted Materials',
+        'match': ['quoted_materials', 'code'],
+        'columns': {
+            'Quoted Materials': ('quoted_materials', STRING, None),
+            'Alarm': ('alarm', STRING, None),
+            'Cost': ('cost', STRING, None),
+            'Adj %': ('adjustment_percent', STRING, None),
+            'Adj $': ('adjustment_amount', STRING, None),
+            'Adjusted Cost': ('adjusted_cost', STRING, None),
+            'Vendor': ('vendor', STRING, None),
+            'Notes': ('notes', STRING, None),
+            'Code': ('code', STRING, None),
+            'Type': ('type', STRING, None),
+        },
+    },
+    'FnPrc': {
+        'model': 'ProjectFnprc',
+        'key': 'Code',
+        'match': ['code'],
+        'columns': {
+            'Final Price': ('final_price', FLOAT, None),
+            'Calc %': ('calc_percentage', FLOAT, None),
+            'Calc $': ('calc_amount', FLOAT, None),
+            'Variance %': ('variance_percentage', FLOAT, None),
+            'Modified $': ('modified_amount', FLOAT, None),
+            'Modified %': ('modified_percentage', FLOAT, None),
+            'Final Price %': ('final_price_percentage', FLOAT, None),
+            'Alarm': ('alarm', BOOLEAN, None),
+            'Code': ('code', STRING, None),
+        },
+    },
+}
+
+
+def get_model(sheet_name):
+    """Get the SQLAlchemy model a mapped sheet is imported into"""
+    from src import models
+    return getattr(models, SHEET_MAPPINGS[sheet_name]['model'])
+
+
+# Row skip rules: each turns one whole column into a mask of rows to skip
+BLANK = 'blank'
+TOTAL_LABEL = 'total_label'
+CONTAINS_TOTAL = 'contains_total'
+
+# Rule column meaning "the sheet's first column"
+FIRST_COLUMN = None
+
+# Subtotal and grand total labels, matched against the whole cell so that
+# line items such as "Total Station Rental" are kept
+TOTAL_LABEL_RE = re.compile(r'^\s*(?:grand\s+|sub\s*-?\s*)?total\s*:?\s*$', re.IGNORECASE)
+
+
+def _blank_cells(column):
+    """Null or whitespace-only cells"""
+    return (column.isna() | (column.astype(str).str.strip() == '')).to_numpy()
+
+
+def _total_label_cells(column):
+    """Cells that are just Total, Subtotal or Grand Total"""
+    return (column.notna() & column.astype(str).str.contains(TOTAL_LABEL_RE)).to_numpy()
+
+
+def _contains_total_cells(column):
+    """Cells containing 'total' anywhere, in any case"""
+    return (column.notna() & column.astype(str).str.contains('total', case=False, regex=False)).to_numpy()
+
+
+SKIP_RULES = {
+    BLANK: (_blank_cells, 'Blank {column}'),
+    TOTAL_LABEL: (_total_label_cells, 'Total row'),
+    CONTAINS_TOTAL: (_contains_total_cells, 'Total row'),
+}
+
+# Rules for sheets without a mapping: the dynamic importer's subtotal check
+DEFAULT_SKIP_RULES = [(CONTAINS_TOTAL, FIRST_COLUMN)]
+
+
+def skip_rules(sheet_name):
+    """
+    (rule, column) pairs a sheet's rows are filtered with.
+
+    A mapping may list its own under 'skip'; otherwise mapped sheets skip
+    rows whose key is blank or a Total label, and other sheets use
+    DEFAULT_SKIP_RULES.
+    """
+    mapping = SHEET_MAPPINGS.get(sheet_name)
+    if mapping is None:
+        return DEFAULT_SKIP_RULES
+    return mapping.get('skip', [(BLANK, mapping['key']), (TOTAL_LABEL, mapping['key'])])
+
+
+def skip_masks(sheet_name, df, rules=None):
+    """
+    Apply a sheet's skip rules as whole-column masks.
+
+    Returns {reason: mask} for the reasons that matched any row. A row
+    matched by several rules counts under the first, so the masks never
+    overlap. Rules naming a column the sheet lacks are ignored.
+    """
+    rules = skip_rules(sheet_name) if rules is None else rules
+    skip = np.zeros(len(df), dtype=bool)
+    masks = {}
+    for rule, column in rules:
+        if column is FIRST_COLUMN:
+            if len(df.columns) == 0:
+                continue
+            column = df.columns[0]
+        elif column not in df.columns:
+            continue
+        cells, reason = SKIP_RULES[rule]
+        matched = cells(df[column]) & ~skip
+        if matched.any():
+            reason = reason.format(column=column)
+            masks[reason] = masks[reason] | matched if reason in masks else matched
+            skip |= matched
+    return masks
+
+
+def skip_rows(sheet_name, df, rules=None):
+    """Drop the rows a sheet's skip rules match; returns (kept rows, {reason: count})"""
+    masks = skip_masks(sheet_name, df, rules)
+    if not masks:
+        return df, {}
+    skip = np.logical_or.reduce(list(masks.values()))
+    return df[~skip], {reason: int(mask.sum()) for reason, mask in masks.items()}
+
+
+def add_skipped(skipped, counts):
+    """Merge {reason: count} into a caller's skipped dict, if it passed one"""
+    if skipped is not None:
+        for reason, count in counts.items():
+            skipped[reason] = skipped.get(reason, 0) + count
+
+
+def describe_skipped(skipped):
+    """One-line summary of skipped row counts, e.g. '3 Total row, 1 Blank code'"""
+    return ', '.join(f"{count} {reason}" for reason, count in skipped.items())
+
+
+def add_outliers(outliers, header, series, bad):
+    """
+    Count a column's cells that could not be converted into a caller's
+    outliers dict, {header: {'count': n, 'examples': [...]}}, keeping the
+    first few row numbers and values.
+    """
+    if outliers is None or not bad.any():
+        return
+    entry = outliers.setdefault(header, {'count': 0, 'examples': []})
+    positions = np.flatnonzero(bad)
+    entry['count'] += len(positions)
+    room = max(MAX_OUTLIER_EXAMPLES - len(entry['examples']), 0)
+    entry['examples'] += [f"row {series.index[position]}: {series.iloc[position]!r}" for position in positions[:room]]
+
+
+def describe_outliers(outliers):
+    """One-line summary of values stored as NULL, e.g. Rate $: 2 (row 4: 'abc', row 9: 'n/a')"""
+    return '; '.join(
+        f"{header}: {entry['count']} ({', '.join(entry['examples'])})" for header, entry in outliers.items()
+    )
+
+
+def clean_frame(df):
+    """
+    Drop all-empty rows from a sheet, keeping every column's native dtype.
+
+    Nulls stay NaN/NaT so numeric columns remain float64 rather than
+    Python objects; they become None only at the database boundary
+    (coerce_column, db_records). When there are no empty rows, or they
+    are all trailing, no data is copied.
+    """
+    keep = df.notna().to_numpy().any(axis=1)
+    kept = int(keep.sum())
+    if kept == len(df):
+        return df
+    if keep[:kept].all():
+        return df.iloc[:kept]
+    return df[keep]
+
+
+def db_records(df):
+    """Row dicts for a frame with every null as None"""
+    return df.astype(object).where(df.notna(), None).to_dict('records')
+
+
+def mapped_columns(sheet_name):
+    """Headers a mapped sheet is read with, None for sheets without a mapping"""
+    mapping = SHEET_MAPPINGS.get(sheet_name)
+    return list(mapping['columns']) if mapping else None
+
+
+def parse_numbers(series):
+    """
+    Parse a column of Accubid numbers as floats in a few vectorized passes.
+
+    Besides plain numbers this accepts currency signs, thousands
+    separators, percent signs ("15%" is 15.0), accounting negatives such
+    as "(12.00)", the accounting dash for zero and a trailing price unit
+    such as "1.2 E". Returns a float Series (NaN for nulls and blanks) and
+    a boolean mask of the cells that had a value but could not be parsed.
+    """
+    if pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+        return series.astype(float), np.zeros(len(series), dtype=bool)
+
+    present = series.notna()
+    numbers = pd.to_numeric(series, errors='coerce').astype(float)
+
+    # Only cells that are not numbers already go through the string passes
+    text_cells = (present & numbers.isna()).to_numpy() & series.map(lambda value: isinstance(value, str)).to_numpy()
+    if text_cells.any():
+        text = series[text_cells].str.strip()
+        negative = text.str.contains(r'\(.*\)')
+        text = text.str.replace(NUMBER_DECORATION_RE, '', regex=True)
+        text = text.str.replace(PRICE_UNIT_RE, '', regex=True)
+        text = text.mask(text == '-', '0')
+        parsed = pd.to_numeric(text, errors='coerce')
+        numbers[text_cells] = parsed.where(~negative, -parsed).to_numpy()
+        # Blank strings are nulls, not failures
+        present[text_cells] = (text != '').to_numpy()
+
+    return numbers, (present & numbers.isna()).to_numpy()
+
+
+def parse_datetimes(series):
+    """
+    Convert a date column to datetime64 in whole-column passes.
+
+    Real dates pass straight through, numbers (and numeric strings) in
+    EXCEL_SERIAL_MIN..EXCEL_SERIAL_MAX are read as serial days, and any
+    other text is parsed with per-value format detection, so a column mixing
+    "2025-01-15" and "1/15/2025" converts in one call. Returns the
+    datetime Series (NaT for nulls) and a boolean mask of the cells that
+    had a value but could not be parsed.
+    """
+    present = series.notna()
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return series, np.zeros(len(series), dtype=bool)
+
+    values = pd.Series(pd.NaT, index=series.index, dtype='datetime64[ns]')
+
+    # Excel serial day numbers; bools are not dates
+    numbers = pd.to_numeric(series, errors='coerce')
+    numbers = numbers.where(~series.map(lambda value: isinstance(value, (bool, np.bool_))))
+    serial = numbers.between(EXCEL_SERIAL_MIN, EXCEL_SERIAL_MAX)
+    if serial.any():
+        values[serial] = pd.to_datetime(numbers[serial], unit='D', origin=EXCEL_EPOCH).dt.round('ms')
+
+    rest = present & ~serial & numbers.isna()
+    if rest.any():
+        values[rest] = _parse_mixed(series[rest])
+
+    return values, (present & values.isna()).to_numpy()
+
+
+def _parse_mixed(series):
+    """to_datetime for dates and date strings in any mix of formats and offsets"""
+    try:
+        parsed = pd.to_datetime(series, errors='coerce', format='mixed')
+    except (TypeError, ValueError):
+        # Mixed UTC offsets: normalise to UTC, then drop the zone
+        parsed = pd.to_datetime(series, errors='coerce', format='mixed', utc=True)
+    if getattr(parsed.dt, 'tz', None) is not None:
+        parsed = parsed.dt.tz_convert(None)
+    return parsed
+
+
+def coerce_column(series, kind, default=None):
+    """
+    Coerce one sheet column to its model type.
+
+    Returns an object array (None for nulls) and a boolean mask of the
+    cells that had a value but could not be converted.
+    """
+    present = series.notna()
+
+    if kind == FLOAT:
+        values, bad = parse_numbers(series)
+    elif kind == INTEGER:
+        numbers, unparsed = parse_numbers(series)
+        whole = numbers.notna() & (numbers % 1 == 0)
+        values = numbers.where(whole).astype('Int64')
+        bad = unparsed | (numbers.notna() & ~whole).to_numpy()
+    elif kind == BOOLEAN:
+        values = series.astype(str).str.strip().str.lower().map(BOOLEAN_VALUES).where(present)
+        bad = present & values.isna()
+    elif kind == DATETIME:
+        values, bad = parse_datetimes(series)
+    else:
+        values = series.astype(str).where(present)
+        bad = pd.Series(False, index=series.index)
+
+    values = values.astype(object).where(values.notna(), default)
+    return values.to_numpy(), np.asarray(bad)
+
+
+class SheetConverter:
+    """
+    A SHEET_MAPPINGS entry compiled for conversion.
+
+    The entry is checked once, when it is compiled, and flattened into a
+    plan of (header, kind, default) steps, so converting a sheet is a
+    single pass of whole-column coercions with no per-row code and no
+    mapping lookups.
+    """
+
+    def __init__(self, sheet_name, mapping):
+        columns = mapping['columns']
+        names = [column for column, _, _ in columns.values()]
+        problems = [f"unknown kind {kind!r} for {header!r}" for header, (_, kind, _) in columns.items() if kind not in KINDS]
+        problems += [f"column {name!r} mapped twice" for name in sorted(set(names)) if names.count(name) > 1]
+        if mapping['key'] not in columns:
+            problems.append(f"key {mapping['key']!r} is not a mapped header")
+        problems += [f"match column {name!r} is not mapped" for name in mapping['match'] if name not in names]
+        problems += [f"unknown skip rule {rule!r}" for rule, _ in mapping.get('skip', []) if rule not in SKIP_RULES]
+        if problems:
+            raise ValueError(f"{sheet_name} mapping: {'; '.join(problems)}")
+
+        self.sheet_name = sheet_name
+        self.model = mapping['model']
+        self.headers = list(columns)
+        self.columns = names
+        self.plan = [(header, kind, default) for header, (_, kind, default) in columns.items()]
+
+    def convert(self, df):
+        """
+        Coerce a sheet's mapped headers to their model columns.
+
+        Each column is converted in its native dtype. A value that cannot
+        be coerced is stored as None, not as the column's default. Returns
+        one object array per column in self.columns order (None for nulls)
+        and {header: mask} of the cells that could not be coerced, for the
+        headers that had any.
+        """
+        arrays = []
+        outliers = {}
+        for header, kind, default in self.plan:
+            values, bad = coerce_column(df[header], kind, default)
+            if bad.any():
+                values = np.where(bad, None, values)
+                outliers[header] = bad
+            arrays.append(values)
+        return arrays, outliers
+
+
+# Mapped sheet -> its compiled converter
+CONVERTERS = {sheet_name: SheetConverter(sheet_name, mapping) for sheet_name, mapping in SHEET_MAPPINGS.items()}
+
+
+def convert_sheet(sheet_name, df, project_id, user_id, skipped=None, outliers=None):
+    """
+    Convert a cleaned sheet into row dicts for its model.
+
+    Columns are coerced in their native dtypes and nulls turned into None
+    only here, as the rows are built. Each record carries the row_hash
+    fingerprint of its values.
+
+    Rows matched by the sheet's skip rules (blank key, Total rows) are
+    dropped first and counted by reason into skipped. A value that cannot
+    be coerced is stored as NULL, the rest of its row is kept, and the
+    cell is reported per column into outliers (see add_outliers).
+    Returns (records, error_count), error_count being the cells stored
+    as NULL.
+    """
+    from src.fingerprints import ROW_HASH, row_hash
+    from src.workbook import check_columns
+
+    converter = CONVERTERS[sheet_name]
+    check_columns(sheet_name, df.columns, converter.headers)
+
+    df, counts = skip_rows(sheet_name, df)
+    add_skipped(skipped, counts)
+
+    arrays, bad_cells = converter.convert(df)
+    for header, bad in bad_cells.items():
+        add_outliers(outliers, header, df[header], bad)
+    columns = converter.columns + [ROW_HASH, 'project_id', 'user_id']
+    records = [
+        dict(zip(columns, row + (row_hash(row), project_id, user_id)))
+        for row in zip(*arrays)
+    ]
+    return records, sum(int(bad.sum()) for bad in bad_cells.values())
+
+
+def bulk_insert(db, table, records, batch_size=None, on_progress=None):
+    """
+    Insert row dicts into a Core table in executemany batches.
+
+    on_progress(rows_done, total_rows) is called after every batch.
+    Returns the rows/sec achieved so callers can report it per table.
+    """
+    batch_size = batch_size or BATCH_SIZE
+    started = time.perf_counter()
+    statement = table.insert()
+    for offset in range(0, len(records), batch_size):
+        batch = records[offset:offset + batch_size]
+        db.execute(statement, batch)
+        if on_progress:
+            on_progress(offset + len(batch), len(records))
+
+    elapsed = time.perf_counter() - started
+    rows_per_sec = len(records) / elapsed if elapsed > 0 else 0.0
+    logger.info(f"{table.name}: inserted {len(records)} rows in {elapsed:.2f}s ({rows_per_sec:.0f} rows/sec)")
+    return rows_per_sec
+
+
+def update_rows(db, table, records, batch_size=None):
+    """Update rows by primary key in executemany batches; each record carries its '_id'"""
+    from sqlalchemy import bindparam
+
+    batch_size = batch_size or BATCH_SIZE
+    statement = table.update().where(table.c.id == bindparam('_id'))
+    for offset in range(0, len(records), batch_size):
+        db.execute(statement, records[offset:offset + batch_size])
+
+
+def delete_rows(db, table, ids, batch_size=None):
+    """Delete rows by primary key, one IN (...) statement per batch"""
+    batch_size = batch_size or BATCH_SIZE
+    for offset in range(0, len(ids), batch_size):
+        db.execute(table.delete().where(table.c.id.in_(ids[offset:offset + batch_size])))
+
+
+def _match_key(values):
+    """Normalised revision match key, so '12' and ' 12' find the same row"""
+    return tuple(None if value is None else str(value).strip() for value in values)
+
+
+def revise_sheet(sheet_name, df, db, project_id, user_id, batch_size=None, on_progress=None):
+    """
+    Apply a revised sheet to a project as a diff against its existing rows.
+
+    Rows are matched on the sheet's stable match key (catalog number,
+    description and sort codes for Ext; labor type or name plus code for
+    the labor sheets). Matched rows whose fingerprint changed are updated
+    in place, unmatched incoming rows inserted and unmatched existing rows
+    deleted, each as set-based batches, so the work done scales with the
+    size of the revision rather than the size of the bid.
+
+    on_progress(rows_done, total_rows) reports the rows written so far.
+    Returns a dict of inserted, updated, deleted, unchanged, errors (cells
+    stored as NULL), skipped ({reason: count}), outliers (see
+    add_outliers) and rows_per_sec (sheet rows diffed per second).
+    """
+    from sqlalchemy import select
+    from src.fingerprints import ROW_HASH
+
+    started = time.perf_counter()
+    mapping = SHEET_MAPPINGS[sheet_name]
+    table = get_model(sheet_name).__table__
+    key_columns = mapping['match']
+    skipped = {}
+    outliers = {}
+    records, error_count = convert_sheet(sheet_name, df, project_id, user_id, skipped, outliers)
+
+    existing = defaultdict(list)
+    rows = db.execute(
+        select(table.c.id, table.c[ROW_HASH], *[table.c[column] for column in key_columns])
+        .where(table.c.project_id == project_id)
+    )
+    for row in rows:
+        existing[_match_key(row[2:])].append((row[0], row[1]))
+
+    inserts = []
+    updates = []
+    unchanged = 0
+    for record in records:
+        candidates = existing.get(_match_key(record[column] for column in key_columns))
+        if not candidates:
+            inserts.append(record)
+            continue
+
+        # Prefer an identical row so reordered duplicates are not rewritten
+        position = next(
+            (i for i, (_, fingerprint) in enumerate(candidates) if fingerprint == record[ROW_HASH]), 0
+        )
+        row_id, fingerprint = candidates.pop(position)
+        if fingerprint == record[ROW_HASH]:
+            unchanged += 1
+        else:
+            updates.append(dict(record, _id=row_id))
+
+    deletes = [row_id for candidates in existing.values() for row_id, _ in candidates]
+
+    changed = len(inserts) + len(updates)
+    if inserts:
+        bulk_insert(db, table, inserts, batch_size, on_progress and (lambda done, _: on_progress(done, changed)))
+    update_rows(db, table, updates, batch_size)
+    delete_rows(db, table, deletes, batch_size)
+    if on_progress:
+        on_progress(changed, changed)
+
+    elapsed = time.perf_counter() - started
+    logger.info(
+        f"{table.name}: revision applied, {len(inserts)} inserted, {len(updates)} updated, "
+        f"{len(deletes)} deleted, {unchanged} unchanged in {elapsed:.2f}s"
+    )
+    return {
+        'inserted': len(inserts),
+        'updated': len(updates),
+        'deleted': len(deletes),
+        'unchanged': unchanged,
+        'errors': error_count,
+        'skipped': skipped,
+        'outliers': outliers,
+        'rows_per_sec': len(records) / elapsed if elapsed > 0 else 0.0,
+    }
+
+
+def import_sheet(sheet_name, df, db, project_id, user_id, batch_size=None, sync=None, on_progress=None,
+                 skipped=None, outliers=None):
+    """
+    Convert a sheet and bulk insert its rows into the mapped table.
+
+    Rows identical to one the project already holds are skipped and rows
+    that are no longer in the sheet deleted (see RowSync); pass a shared
+    sync to import one sheet in several chunks, and delete its stale rows
+    after the last one. on_progress(rows_done, total_rows) is called
+    after every insert batch; rows dropped by the skip rules are counted
+    by reason into skipped and values stored as NULL reported per column
+    into outliers. Returns (imported, errors, rows_per_sec), errors being
+    the cells stored as NULL.
+    """
+    from src.fingerprints import ROW_HASH, RowSync
+
+    table = get_model(sheet_name).__table__
+    records, error_count = convert_sheet(sheet_name, df, project_id, user_id, skipped, outliers)
+
+    whole_sheet = sync is None
+    if whole_sheet:
+        sync = RowSync(db, table, project_id)
+    records = [record for record in records if not sync.claim(record[ROW_HASH])]
+
+    rows_per_sec = 0.0
+    if records:
+        rows_per_sec = bulk_insert(db, table, records, batch_size, on_progress)
+    if whole_sheet:
+        sync.delete_stale(batch_size or BATCH_SIZE)
+    return len(records), error_count, rows_per_sec
+
+
+def stream_sheet(sheet_name, source, db, project_id, user_id, chunk_size=None, batch_size=None, on_progress=None,
+                 skipped=None, outliers=None):
+    """
+    Import a sheet as a pipeline of fixed-size chunks.
+
+    Each chunk is read, cleaned, converted and inserted before the next
+    one is read, so memory is bounded by the chunk size rather than the
+    sheet length. on_progress(rows_read, None) is called after every
+    chunk, as the sheet length is not known up front. Skipped rows and
+    values stored as NULL are counted into skipped and outliers, across
+    all chunks. The raw chunks are
+    hashed as they are read, for the sheet's fingerprint record.
+    Returns (imported, errors, rows_per_sec, total_rows, sheet_hash).
+    """
+    from src.fingerprints import RowSync, SheetHasher
+    from src.workbook import iter_sheet_chunks
+
+    sync = RowSync(db, get_model(sheet_name).__table__, project_id)
+    hasher = SheetHasher()
+    started = time.perf_counter()
+    imported_count = 0
+    error_count = 0
+    total_rows = 0
+    rows_read = 0
+    usecols = mapped_columns(sheet_name)
+    for chunk in iter_sheet_chunks(source, sheet_name, chunk_size, usecols):
+        hasher.update(chunk)
+        # Number rows across the whole sheet, as a whole-sheet read would
+        chunk.index += rows_read
+        rows_read += len(chunk)
+        chunk = clean_frame(chunk)
+        total_rows += len(chunk)
+        imported, errors, _ = import_sheet(
+            sheet_name, chunk, db, project_id, user_id, batch_size, sync, skipped=skipped, outliers=outliers
+        )
+        imported_count += imported
+        error_count += errors
+        if on_progress:
+            on_progress(total_rows, None)
+    sync.delete_stale(batch_size or BATCH_SIZE)
+
+    elapsed = time.perf_counter() - started
+    rows_per_sec = imported_count / elapsed if elapsed > 0 else 0.0
+    return imported_count, error_count, rows_per_sec, total_rows, hasher.hexdigest()
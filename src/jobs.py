@@ -0,0 +1,260 @@
+"""
+Background import jobs
+
+The web importer submits each import as a job instead of running it in
+the request thread. Jobs run on a small local thread pool and their state
+lives in the import_jobs table of the application database, so any
+server worker can answer a /jobs/<id> poll and a request returns as soon
+as the job is queued.
+
+Each job records the process that owns it, and that process refreshes
+the heartbeat of its unfinished jobs while it is alive. Only jobs whose
+heartbeat has gone stale are failed as interrupted, so a server worker
+starting up leaves the jobs of its siblings alone.
+"""
+
+import json
+import logging
+import os
+import socket
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import or_
+from sqlalchemy.sql import func
+
+logger = logging.getLogger(__name__)
+
+# Imports run at the same time by one server process
+IMPORT_JOB_WORKERS = int(os.getenv("IMPORT_JOB_WORKERS", "2"))
+
+# Seconds between heartbeats of the jobs a process owns
+IMPORT_JOB_HEARTBEAT_SECONDS = float(os.getenv("IMPORT_JOB_HEARTBEAT_SECONDS", "15"))
+
+# Seconds without a heartbeat after which an unfinished job counts as interrupted
+IMPORT_JOB_STALE_SECONDS = float(os.getenv("IMPORT_JOB_STALE_SECONDS", "120"))
+
+# Job states
+QUEUED = 'queued'
+RUNNING = 'running'
+SUCCEEDED = 'succeeded'
+FAILED = 'failed'
+
+# Identifies this process in import_jobs.owner; the suffix tells apart a
+# restarted process that was given the same pid
+OWNER = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+_pool = None
+_pool_lock = threading.Lock()
+
+# State of the jobs running in this process, including row-level progress
+# that is never written to the database: the import transaction may hold
+# the database lock (SQLite), so pollers here are answered from memory
+_live = {}
+
+
+def _get_pool():
+    """Start the worker pool on first use"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _fail_interrupted_jobs()
+            _pool = ThreadPoolExecutor(max_workers=max(IMPORT_JOB_WORKERS, 1), thread_name_prefix='import-job')
+            threading.Thread(target=_heartbeat_loop, name='import-job-heartbeat', daemon=True).start()
+        return _pool
+
+
+def _now():
+    """Heartbeats are written and compared in UTC"""
+    return datetime.now(timezone.utc)
+
+
+def _heartbeat_loop():
+    """Keep this process's jobs alive and reap those of processes that are gone"""
+    while True:
+        time.sleep(IMPORT_JOB_HEARTBEAT_SECONDS)
+        _beat()
+        _fail_interrupted_jobs()
+
+
+def _beat():
+    """Refresh the heartbeat of every unfinished job this process owns"""
+    from src.database import SessionLocal
+    from src.models import ImportJob
+
+    db = SessionLocal()
+    try:
+        db.query(ImportJob).filter(
+            ImportJob.owner == OWNER,
+            ImportJob.status.in_([QUEUED, RUNNING]),
+        ).update({'heartbeat_at': _now()}, synchronize_session=False)
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        logger.warning(f"Could not record import job heartbeat: {e}")
+    finally:
+        db.close()
+
+
+def _fail_interrupted_jobs():
+    """Jobs whose owner stopped sending heartbeats will never finish"""
+    from src.database import SessionLocal
+    from src.models import ImportJob
+
+    cutoff = _now() - timedelta(seconds=IMPORT_JOB_STALE_SECONDS)
+    db = SessionLocal()
+    try:
+        count = (
+            db.query(ImportJob)
+            .filter(
+                ImportJob.status.in_([QUEUED, RUNNING]),
+                or_(ImportJob.owner.is_(None), ImportJob.owner != OWNER),
+                # Jobs from before owners were recorded have no heartbeat
+                or_(ImportJob.heartbeat_at.is_(None), ImportJob.heartbeat_at < cutoff),
+            )
+            .update({'status': FAILED, 'error': 'Interrupted: the server process running it stopped',
+                     'finished_at': func.now()},
+                    synchronize_session=False)
+        )
+        db.commit()
+        if count:
+            logger.warning(f"Marked {count} interrupted import jobs as failed")
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Could not clean up interrupted import jobs: {e}")
+    finally:
+        db.close()
+
+
+def _update(job_id, **values):
+    """Write job state in its own short transaction"""
+    from src.database import SessionLocal
+    from src.models import ImportJob
+
+    db = SessionLocal()
+    try:
+        db.query(ImportJob).filter(ImportJob.id == job_id).update(values, synchronize_session=False)
+        db.commit()
+    finally:
+        db.close()
+
+
+def _run_job(job_id, run, args, kwargs):
+    """Worker thread: run one import and record how it ended"""
+    _update(job_id, status=RUNNING, started_at=func.now())
+    _live[job_id] = get_job(job_id)
+
+    # Every sheet's latest detail is kept, so a slow poller misses no sheet
+    sheets = {}
+
+    def progress(sheet_name, completed, live=False, **detail):
+        if detail:
+            sheets[sheet_name] = dict(sheets.get(sheet_name, {}), **detail)
+        _live[job_id] = dict(
+            _live[job_id],
+            current_sheet=sheet_name,
+            completed_sheets=completed,
+            progress=json.loads(json.dumps(sheets)),
+        )
+        if live:
+            return
+
+        try:
+            _update(job_id, current_sheet=sheet_name, completed_sheets=completed, progress=json.dumps(sheets))
+        except Exception as e:
+            # Progress is best effort and must never fail the import itself
+            logger.warning(f"Could not record progress of import job {job_id}: {e}")
+
+    try:
+        result = run(*args, progress=progress, **kwargs)
+    except Exception as e:
+        logger.exception(f"Import job {job_id} failed")
+        _update(job_id, status=FAILED, error=str(e), current_sheet=None, finished_at=func.now())
+        return
+    finally:
+        _live.pop(job_id, None)
+
+    _update(
+        job_id,
+        status=SUCCEEDED,
+        result=json.dumps(result, default=str),
+        current_sheet=None,
+        progress=json.dumps(sheets),
+        finished_at=func.now(),
+    )
+
+
+def submit_job(run, sheets, *args, **kwargs):
+    """
+    Queue run(*args, progress=..., **kwargs) as a background import job.
+
+    run reports progress as progress(sheet_name, completed_sheets, **detail),
+    where detail holds row counts and throughput for that sheet, and
+    returns a JSON-serialisable result. Pass live=True for frequent
+    row-level updates that only need to reach this process's pollers.
+    Returns the new job id.
+    """
+    from src.database import SessionLocal
+    from src.models import ImportJob
+
+    pool = _get_pool()
+
+    db = SessionLocal()
+    try:
+        job = ImportJob(
+            status=QUEUED,
+            sheets=json.dumps(sheets),
+            total_sheets=len(sheets),
+            completed_sheets=0,
+            owner=OWNER,
+            heartbeat_at=_now(),
+        )
+        db.add(job)
+        db.commit()
+        job_id = job.id
+    finally:
+        db.close()
+
+    pool.submit(_run_job, job_id, run, args, kwargs)
+    return job_id
+
+
+def get_job(job_id):
+    """
+    Current state of a job as a dict, None if there is no such job.
+
+    A job running in this process is answered from memory, with its
+    latest row-level progress; other processes see progress at sheet
+    boundaries.
+    """
+    from src.database import SessionLocal
+    from src.models import ImportJob
+
+    live = _live.get(job_id)
+    if live is not None:
+        return dict(live)
+
+    db = SessionLocal()
+    try:
+        job = db.get(ImportJob, job_id)
+        if job is None:
+            return None
+        return {
+            'id': job.id,
+            'status': job.status,
+            'sheets': json.loads(job.sheets) if job.sheets else [],
+            'total_sheets': job.total_sheets,
+            'completed_sheets': job.completed_sheets,
+            'current_sheet': job.current_sheet,
+            'progress': json.loads(job.progress) if job.progress else None,
+            'result': json.loads(job.result) if job.result else None,
+            'error': job.error,
+            'created_at': job.created_at.isoformat() if job.created_at else None,
+            'started_at': job.started_at.isoformat() if job.started_at else None,
+            'finished_at': job.finished_at.isoformat() if job.finished_at else None,
+        }
+    finally:
+        db.close()
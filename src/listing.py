@@ -0,0 +1,154 @@
+"""
+Keyset-paginated listings of users, projects and project_* items
+
+Pages are read with WHERE key > cursor ORDER BY key LIMIT n rather than
+OFFSET, so the thousandth page costs the same as the first. Item tables
+page on (project_id, id); users and projects page on id. Totals come from
+a short-lived cache because COUNT(*) over millions of rows is the slowest
+query a listing would otherwise run on every page.
+"""
+
+import os
+import threading
+import time
+
+from sqlalchemy import and_, func, or_, select
+
+# Rows per page when the caller does not ask for a size, and the upper bound
+LISTING_PAGE_SIZE = int(os.getenv("LISTING_PAGE_SIZE", "50"))
+LISTING_MAX_PAGE_SIZE = int(os.getenv("LISTING_MAX_PAGE_SIZE", "500"))
+
+# Seconds a cached row count is served before it is recounted
+COUNT_CACHE_TTL = int(os.getenv("COUNT_CACHE_TTL", "60"))
+
+# project_* tables holding import bookkeeping rather than items; never listed
+BOOKKEEPING_TABLES = ('project_imports', 'project_import_sheets')
+
+_counts = {}
+_counts_lock = threading.Lock()
+
+
+def is_item_table(table_name):
+    """True for the project_* tables that hold a project's imported items"""
+    return table_name.startswith('project_') and table_name not in BOOKKEEPING_TABLES
+
+
+def get_listing_table(bind, table_name):
+    """
+    Table for a listing: users, projects or any project_* item table.
+
+    Raises KeyError for any other name or a table that does not exist.
+    """
+    from src.database import Base
+    from src.table_cache import get_table
+
+    if table_name in ('users', 'projects'):
+        return Base.metadata.tables[table_name]
+
+    table = get_table(bind, table_name) if is_item_table(table_name) else None
+    if table is None or 'project_id' not in table.c or 'id' not in table.c:
+        raise KeyError(f"Unknown listing table: {table_name}")
+    return table
+
+
+def page_keys(table):
+    """Columns a table's pages are ordered and keyed on"""
+    if 'project_id' in table.c:
+        return [table.c.project_id, table.c.id]
+    return [table.c.id]
+
+
+def encode_cursor(values):
+    """Opaque cursor for the key of the last row on a page"""
+    return ','.join(str(value) for value in values)
+
+
+def decode_cursor(cursor, size):
+    """Key values from a cursor; raises ValueError if it is malformed"""
+    try:
+        values = [int(value) for value in cursor.split(',')]
+    except ValueError:
+        values = []
+    if len(values) != size:
+        raise ValueError(f"Invalid cursor: {cursor}")
+    return values
+
+
+def _after(keys, values):
+    """(k1, k2, ...) > (v1, v2, ...) spelled out so every backend can use the index"""
+    key, value = keys[0], values[0]
+    if len(keys) == 1:
+        return key > value
+    return or_(key > value, and_(key == value, _after(keys[1:], values[1:])))
+
+
+def page_size(limit=None):
+    """Requested page size clamped to 1..LISTING_MAX_PAGE_SIZE"""
+    if not limit:
+        return LISTING_PAGE_SIZE
+    return max(1, min(int(limit), LISTING_MAX_PAGE_SIZE))
+
+
+def count_rows(db, table, project_id=None):
+    """Row count of a table or one project's rows, cached for COUNT_CACHE_TTL seconds"""
+    key = (table.name, project_id)
+    now = time.monotonic()
+    with _counts_lock:
+        cached = _counts.get(key)
+        if cached is not None and now - cached[1] < COUNT_CACHE_TTL:
+            return cached[0]
+
+    query = select(func.count()).select_from(table)
+    if project_id is not None:
+        query = query.where(table.c.project_id == project_id)
+    elif 'project_id' in table.c:
+        query = query.where(table.c.project_id.isnot(None))
+    total = db.execute(query).scalar()
+
+    with _counts_lock:
+        _counts[key] = (total, now)
+    return total
+
+
+def invalidate_counts(table_name=None):
+    """Forget cached counts for one table, or all of them, after writes"""
+    with _counts_lock:
+        if table_name is None:
+            _counts.clear()
+            return
+        for key in [key for key in _counts if key[0] == table_name]:
+            del _counts[key]
+
+
+def list_page(db, table, cursor=None, limit=None, project_id=None):
+    """
+    One page of rows after the cursor, in key order.
+
+    Returns a dict with the rows as 'items', 'next_cursor' (None on the
+    last page), 'page_size' and the cached 'total' for the same filter.
+    Item rows without a project_id have no key and are not listed.
+    """
+    limit = page_size(limit)
+    keys = page_keys(table)
+
+    query = select(table)
+    if project_id is not None:
+        query = query.where(table.c.project_id == project_id)
+    elif len(keys) > 1:
+        query = query.where(table.c.project_id.isnot(None))
+    if cursor:
+        query = query.where(_after(keys, decode_cursor(cursor, len(keys))))
+
+    # One extra row tells whether there is a next page without counting
+    rows = db.execute(query.order_by(*keys).limit(limit + 1)).mappings().all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1][key.name] for key in keys)
+
+    return {
+        'items': [dict(row) for row in rows],
+        'next_cursor': next_cursor,
+        'page_size': limit,
+        'total': count_rows(db, table, project_id),
+    }
@@ -1,8 +1,28 @@
-from sqlalchemy import Column, Integer, String, DateTime, Text, Boolean, Float, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, Text, Boolean, Float, Numeric, ForeignKey, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from src.database import Base
 
+# Columns of project tables that rows are looked up by, indexed when present
+LOOKUP_COLUMNS = ('catalog_number', 'code')
+
+# Key prefix indexed for TEXT lookup columns; MySQL cannot index whole TEXT values
+TEXT_INDEX_LENGTH = 100
+
+def project_table_indexes(table_name, lookup_columns=(), text_columns=()):
+    """
+    Indexes every project_* table carries.
+    
+    (project_id, id) serves per-project reads, deletes and keyset pages;
+    each lookup column gets its own index, prefix-limited on MySQL when
+    it is listed in text_columns.
+    """
+    indexes = [Index(f"ix_{table_name}_project_id_id", "project_id", "id")]
+    for column in lookup_columns:
+        options = {"mysql_length": TEXT_INDEX_LENGTH} if column in text_columns else {}
+        indexes.append(Index(f"ix_{table_name}_{column}", column, **options))
+    return tuple(indexes)
+
 class User(Base):
     __tablename__ = "users"
     
@@ -10,6 +30,7 @@ class User(Base):
     username = Column(String(50), unique=True, index=True, nullable=False)
     email = Column(String(100), unique=True, index=True, nullable=False)
     full_name = Column(String(100))
+    role = Column(String(50))
     is_active = Column(Boolean, default=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
@@ -32,6 +53,7 @@ class Project(Base):
 
 class ProjectItem(Base):
     __tablename__ = "project_ext"
+    __table_args__ = project_table_indexes("project_ext", ["catalog_number"])
     
     id = Column(Integer, primary_key=True, index=True)
     
@@ -94,6 +116,9 @@ class ProjectItem(Base):
     # Quick takeoff
     quick_takeoff_code = Column(String(100))
     
+    # Fingerprint of the imported row, used to skip unchanged rows on re-import
+    row_hash = Column(String(32))
+    
     # Timestamps
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
@@ -104,6 +129,7 @@ class ProjectItem(Base):
 
 class ProjectLbfac(Base):
     __tablename__ = "project_lbesc"
+    __table_args__ = project_table_indexes("project_lbesc", ["code"], text_columns=["code"])
     
     id = Column(Integer, primary_key=True, index=True)
     
@@ -119,16 +145,53 @@ class ProjectLbfac(Base):
     escalation_percent = Column(Text)
     escalation_amount = Column(Text)
     financing_percent = Column(Text)
-    total = Column(Text)
+    total = Column(Float)
     code = Column(Text)
     type = Column(Text)
     
+    # Fingerprint of the imported row, used to skip unchanged rows on re-import
+    row_hash = Column(String(32))
+    
+    # Timestamps
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+class ProjectLaborFactoring(Base):
+    __tablename__ = "project_lbfac"
+    __table_args__ = project_table_indexes("project_lbfac", ["code"])
+    
+    id = Column(Integer, primary_key=True, index=True)
+    
+    # Foreign keys
+    project_id = Column(Integer, ForeignKey("projects.id"), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    
+    # Labor Factoring fields, named and typed as migration 8355f29da39e created them
+    labor_factoring = Column(Text)
+    factor = Column(Numeric(10, 2))
+    direct_hours_percentage = Column(Numeric(10, 2))
+    hours = Column(Numeric(10, 2))
+    rate = Column(Numeric(10, 2))
+    subtotal = Column(Numeric(10, 2))
+    burden_percentage = Column(Numeric(10, 2))
+    fringe_amount = Column(Numeric(10, 2))
+    burden_total = Column(Numeric(10, 2))
+    fringe_total = Column(Numeric(10, 2))
+    total = Column(Numeric(10, 2))
+    full_rate = Column(Numeric(10, 2))
+    code = Column(String(50))
+    type = Column(String(50))
+    
+    # Fingerprint of the imported row, used to skip unchanged rows on re-import
+    row_hash = Column(String(32))
+    
     # Timestamps
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
 class ProjectDirlib(Base):
     __tablename__ = "project_dirlb"
+    __table_args__ = project_table_indexes("project_dirlb", ["code"], text_columns=["code"])
     
     id = Column(Integer, primary_key=True, index=True)
     
@@ -139,24 +202,28 @@ class ProjectDirlib(Base):
     # Direct Labor fields
     labor_type = Column(Text)
     crew = Column(Text)
-    hours = Column(Text)
-    rate = Column(Text)
-    sub_total = Column(Text)
+    hours = Column(Float)
+    rate = Column(Float)
+    sub_total = Column(Float)
     brdn = Column(Text)
     frng = Column(Text)
-    brdn_total = Column(Text)
-    frng_total = Column(Text)
-    total = Column(Text)
-    full_rate = Column(Text)
+    brdn_total = Column(Float)
+    frng_total = Column(Float)
+    total = Column(Float)
+    full_rate = Column(Float)
     code = Column(Text)
     type = Column(Text)
     
+    # Fingerprint of the imported row, used to skip unchanged rows on re-import
+    row_hash = Column(String(32))
+    
     # Timestamps
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
 class ProjectInclb(Base):
     __tablename__ = "project_inclb"
+    __table_args__ = project_table_indexes("project_inclb", ["code"], text_columns=["code"])
     
     id = Column(Integer, primary_key=True, index=True)
     
@@ -166,24 +233,28 @@ class ProjectInclb(Base):
     
     # Incidental Labor fields
     incidental_labor = Column(Text)
-    hours = Column(Text)
-    rate = Column(Text)
-    sub_total = Column(Text)
+    hours = Column(Float)
+    rate = Column(Float)
+    sub_total = Column(Float)
     brdn = Column(Text)
     frng = Column(Text)
-    brdn_total = Column(Text)
-    frng_total = Column(Text)
-    total = Column(Text)
-    full_rate = Column(Text)
+    brdn_total = Column(Float)
+    frng_total = Column(Float)
+    total = Column(Float)
+    full_rate = Column(Float)
     code = Column(Text)
     type = Column(Text)
     
+    # Fingerprint of the imported row, used to skip unchanged rows on re-import
+    row_hash = Column(String(32))
+    
     # Timestamps
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
 class ProjectIndlb(Base):
     __tablename__ = "project_indlb"
+    __table_args__ = project_table_indexes("project_indlb", ["code"])
     
     id = Column(Integer, primary_key=True, index=True)
     
@@ -191,21 +262,245 @@ class ProjectIndlb(Base):
     project_id = Column(Integer, ForeignKey("projects.id"), nullable=False)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     
-    # Indirect Labor fields
+    # Indirect Labor fields, named and typed as migration c9f551489835 created them
     indirect_labor = Column(Text)
-    labor_percent = Column(Text)
-    hours = Column(Text)
-    rate = Column(Text)
-    sub_total = Column(Text)
-    brdn = Column(Text)
-    frng = Column(Text)
-    brdn_total = Column(Text)
-    frng_total = Column(Text)
+    labor_percentage = Column(Numeric(10, 2))
+    hours = Column(Numeric(10, 2))
+    rate = Column(Numeric(10, 2))
+    subtotal = Column(Numeric(10, 2))
+    burden_percentage = Column(Numeric(10, 2))
+    fringe_amount = Column(Numeric(10, 2))
+    burden_total = Column(Numeric(10, 2))
+    fringe_total = Column(Numeric(10, 2))
+    total = Column(Numeric(10, 2))
+    full_rate = Column(Numeric(10, 2))
+    code = Column(String(50))
+    type = Column(String(50))
+    
+    # Fingerprint of the imported row, used to skip unchanged rows on re-import
+    row_hash = Column(String(32))
+    
+    # Timestamps
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now()) 
+
+class ProjectSubs(Base):
+    __tablename__ = "project_subs"
+    __table_args__ = project_table_indexes("project_subs", ["code"], text_columns=["code"])
+    
+    id = Column(Integer, primary_key=True, index=True)
+    
+    # Foreign keys
+    project_id = Column(Integer, ForeignKey("projects.id"), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    
+    # Subcontractor fields
+    subcontractor = Column(Text)
+    alarm = Column(Text)
+    cost = Column(Text)
+    adjustment_percent = Column(Text)
+    adjustment_amount = Column(Text)
+    adjusted_cost = Column(Text)
+    tax_percent = Column(Text)
+    overhead_percent = Column(Text)
+    markup_percent = Column(Text)
+    total = Column(Text)
+    vendor = Column(Text)
+    notes = Column(Text)
+    code = Column(Text)
+    type = Column(Text)
+    
+    # Fingerprint of the imported row, used to skip unchanged rows on re-import
+    row_hash = Column(String(32))
+    
+    # Timestamps
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+class ProjectGnexp(Base):
+    __tablename__ = "project_gnexp"
+    __table_args__ = project_table_indexes("project_gnexp", ["code"], text_columns=["code"])
+    
+    id = Column(Integer, primary_key=True, index=True)
+    
+    # Foreign keys
+    project_id = Column(Integer, ForeignKey("projects.id"), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    
+    # General Expenses fields
+    general_expenses = Column(Text)
+    alarm = Column(Text)
+    quantity = Column(Text)
+    field = Column(Text)
+    duration = Column(Text)
+    cost_per_unit = Column(Text)
+    total_cost = Column(Text)
+    tax_percent = Column(Text)
+    overhead_percent = Column(Text)
+    markup_percent = Column(Text)
+    total = Column(Text)
+    notes = Column(Text)
+    code = Column(Text)
+    type = Column(Text)
+    
+    # Fingerprint of the imported row, used to skip unchanged rows on re-import
+    row_hash = Column(String(32))
+    
+    # Timestamps
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+class ProjectEqpmt(Base):
+    __tablename__ = "project_eqpmt"
+    __table_args__ = project_table_indexes("project_eqpmt", ["code"], text_columns=["code"])
+    
+    id = Column(Integer, primary_key=True, index=True)
+    
+    # Foreign keys
+    project_id = Column(Integer, ForeignKey("projects.id"), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    
+    # Equipment fields
+    equipment = Column(Text)
+    alarm = Column(Text)
+    quantity = Column(Text)
+    field = Column(Text)
+    duration = Column(Text)
+    cost_per_unit = Column(Text)
+    total_cost = Column(Text)
+    tax_percent = Column(Text)
+    overhead_percent = Column(Text)
+    markup_percent = Column(Text)
     total = Column(Text)
-    full_rate = Column(Text)
+    notes = Column(Text)
     code = Column(Text)
     type = Column(Text)
     
+    # Fingerprint of the imported row, used to skip unchanged rows on re-import
+    row_hash = Column(String(32))
+    
     # Timestamps
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now()) 
\ No newline at end of file
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+class ProjectQtmat(Base):
+    __tablename__ = "project_qtmat"
+    __table_args__ = project_table_indexes("project_qtmat", ["code"], text_columns=["code"])
+    
+    id = Column(Integer, primary_key=True, index=True)
+    
+    # Foreign keys
+    project_id = Column(Integer, ForeignKey("projects.id"), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    
+    # Quoted Materials fields
+    quoted_materials = Column(Text)
+    alarm = Column(Text)
+    cost = Column(Text)
+    adjustment_percent = Column(Text)
+    adjustment_amount = Column(Text)
+    adjusted_cost = Column(Text)
+    vendor = Column(Text)
+    notes = Column(Text)
+    code = Column(Text)
+    type = Column(Text)
+    
+    # Fingerprint of the imported row, used to skip unchanged rows on re-import
+    row_hash = Column(String(32))
+    
+    # Timestamps
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+class ProjectFnprc(Base):
+    __tablename__ = "project_fnprc"
+    __table_args__ = project_table_indexes("project_fnprc", ["code"])
+    
+    id = Column(Integer, primary_key=True, index=True)
+    
+    # Foreign keys
+    project_id = Column(Integer, ForeignKey("projects.id"), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    
+    # Final Pricing fields
+    final_price = Column(Numeric(10, 2))
+    calc_percentage = Column(Numeric(5, 2))
+    calc_amount = Column(Numeric(10, 2))
+    variance_percentage = Column(Numeric(5, 2))
+    modified_amount = Column(Numeric(10, 2))
+    modified_percentage = Column(Numeric(5, 2))
+    final_price_percentage = Column(Numeric(5, 2))
+    alarm = Column(Boolean)
+    code = Column(String(50))
+    
+    # Fingerprint of the imported row, used to skip unchanged rows on re-import
+    row_hash = Column(String(32))
+    
+    # Timestamps
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+class ProjectImport(Base):
+    __tablename__ = "project_imports"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    
+    # Foreign keys
+    project_id = Column(Integer, ForeignKey("projects.id"), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    
+    # Source workbook
+    file_name = Column(String(255), index=True)
+    file_hash = Column(String(64), index=True, nullable=False)
+    
+    # Timestamps
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+class ProjectImportSheet(Base):
+    __tablename__ = "project_import_sheets"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    
+    # Foreign keys
+    project_id = Column(Integer, ForeignKey("projects.id"), nullable=False, index=True)
+    
+    # Last imported content of the sheet and the workbook it came from
+    sheet_name = Column(String(100), nullable=False)
+    file_hash = Column(String(64), nullable=False)
+    sheet_hash = Column(String(64), nullable=False)
+    row_count = Column(Integer)
+    
+    # Timestamps
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+class ImportJob(Base):
+    __tablename__ = "import_jobs"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    
+    # Job state: queued, running, succeeded or failed
+    status = Column(String(20), nullable=False, default="queued", index=True)
+    
+    # Progress
+    sheets = Column(Text)
+    total_sheets = Column(Integer, default=0)
+    completed_sheets = Column(Integer, default=0)
+    current_sheet = Column(String(100))
+    
+    # Server process running the job, and when it last reported being alive
+    owner = Column(String(100), index=True)
+    heartbeat_at = Column(DateTime(timezone=True))
+    
+    # Row counts and throughput per sheet so far, stored as JSON
+    progress = Column(Text)
+    
+    # Outcome, stored as JSON
+    result = Column(Text)
+    error = Column(Text)
+    
+    # Timestamps
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    started_at = Column(DateTime(timezone=True))
+    finished_at = Column(DateTime(timezone=True))
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
@@ -0,0 +1,90 @@
+"""
+Parallel per-sheet import across a process pool
+
+Each selected sheet is parsed, converted and written by its own worker
+process with its own engine and connection, so total wall time is close
+to the slowest sheet instead of the sum of all sheets. Meant for MySQL and
+PostgreSQL; SQLite serialises writers, so concurrent sheets mostly wait
+on its file lock.
+"""
+
+import importlib
+import io
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import get_context
+
+logger = logging.getLogger(__name__)
+
+# Worker processes used for parallel sheet imports (0 or 1 = sequential)
+IMPORT_WORKERS = int(os.getenv("IMPORT_WORKERS", "0"))
+
+
+def _resolve(sheet_importer):
+    """Resolve a 'module:function' reference inside the worker"""
+    module_name, function_name = sheet_importer.split(':')
+    return getattr(importlib.import_module(module_name), function_name)
+
+
+def _run_sheet(source, sheet_name, project_id, user_id, sheet_importer, usecols=None):
+    """Worker entry point: import one sheet in its own session"""
+    from src.database import SessionLocal, engine
+    from src.fingerprints import sheet_hash
+    from src.workbook import read_sheet
+
+    # Never reuse connections inherited from the parent process
+    engine.dispose(close=False)
+
+    if isinstance(source, bytes):
+        source = io.BytesIO(source)
+    df = read_sheet(source, sheet_name, usecols)
+
+    db = SessionLocal()
+    try:
+        result = _resolve(sheet_importer)(sheet_name, df, db, project_id, user_id)
+        db.commit()
+        return sheet_hash(df), result
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+def import_sheets_parallel(source, sheet_names, project_id, user_id, sheet_importer, workers=None, usecols=None):
+    """
+    Import sheets concurrently, one worker process per sheet.
+
+    source is a workbook path or an uploaded file object. sheet_importer
+    is a 'module:function' reference called in the worker as
+    fn(sheet_name, df, db, project_id, user_id) on the raw parsed sheet.
+    usecols optionally maps a sheet name to the headers to parse.
+
+    Returns {sheet_name: (sheet_hash, result)}, sheet_hash being that of
+    the raw sheet the worker read; a sheet that failed maps to the
+    exception raised in its worker.
+    """
+    workers = min(workers or IMPORT_WORKERS or os.cpu_count() or 1, len(sheet_names))
+    if not isinstance(source, (str, os.PathLike)):
+        from src.workbook import read_content
+        source = read_content(source)
+
+    results = {}
+    # spawn rather than fork: the Streamlit and Flask servers run threads
+    with ProcessPoolExecutor(max_workers=max(workers, 1), mp_context=get_context('spawn')) as pool:
+        futures = {
+            pool.submit(
+                _run_sheet, source, sheet_name, project_id, user_id, sheet_importer,
+                (usecols or {}).get(sheet_name),
+            ): sheet_name
+            for sheet_name in sheet_names
+        }
+        for future in as_completed(futures):
+            sheet_name = futures[future]
+            try:
+                results[sheet_name] = future.result()
+            except Exception as e:
+                logger.error(f"Parallel import of {sheet_name} failed: {e}")
+                results[sheet_name] = e
+    return results
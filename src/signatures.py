@@ -0,0 +1,123 @@
+"""
+Header-row signatures for recognising known sheet layouts
+
+Nearly every upload is a standard Accubid export whose sheets always
+carry the same headers. A sheet's signature is a hash of the sorted set
+of its headers, so reordered columns do not count as a new layout. The
+layout worked out for a signature (column classification, target
+columns and the column plan per table) is cached, so only header rows
+not seen before go through full examination. Layouts for the mapped
+sheets can be compiled up front with seed_layouts.
+"""
+
+import hashlib
+import logging
+import os
+import threading
+from collections import OrderedDict
+
+from src.ingest import CONVERTERS
+
+logger = logging.getLogger(__name__)
+
+# Sheet layouts kept in memory; least recently used are evicted first
+LAYOUT_CACHE_SIZE = int(os.getenv("LAYOUT_CACHE_SIZE", "256"))
+
+_layouts = OrderedDict()
+_layouts_lock = threading.Lock()
+
+
+def header_signature(columns):
+    """Hash of a header row; the same headers in any order share a signature"""
+    text = '\x1f'.join(sorted({str(column) for column in columns}))
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()[:32]
+
+
+# Headers each mapped sheet is read with, most headers first so that the
+# most specific mapping wins when a sheet carries several
+MAPPED_HEADERS = sorted(
+    ((name, frozenset(str(header) for header in converter.headers)) for name, converter in CONVERTERS.items()),
+    key=lambda item: -len(item[1]),
+)
+
+
+class SheetLayout:
+    """
+    Everything derived from one header row, worked out once per signature.
+
+    targets lists each importable header with the table columns it may be
+    stored in, most preferred first.
+    """
+
+    def __init__(self, signature, columns, valid_columns, skipped_columns, targets, mapped_sheet=None):
+        self.signature = signature
+        self.columns = list(columns)
+        self.valid_columns = valid_columns
+        self.skipped_columns = skipped_columns
+        self.targets = targets
+        self.mapped_sheet = mapped_sheet
+        self._plans = {}
+
+    def column_plan(self, table):
+        """(header, table column) pairs for a table, cached per table shape"""
+        key = (table.name, tuple(table.columns.keys()))
+        plan = self._plans.get(key)
+        if plan is None:
+            table_columns = set(key[1])
+            plan = []
+            for header, candidates in self.targets:
+                column = next((column for column in candidates if column in table_columns), None)
+                if column:
+                    plan.append((header, column))
+            self._plans[key] = plan
+        return plan
+
+
+def mapped_sheet_for(sheet_name, columns):
+    """Mapping a sheet is read with: its own by name, else one whose headers it all carries"""
+    if sheet_name in CONVERTERS:
+        return sheet_name
+    present = {str(column) for column in columns}
+    return next((name for name, headers in MAPPED_HEADERS if headers <= present), None)
+
+
+def get_layout(sheet_name, columns, classify):
+    """
+    Cached layout for a sheet's header row.
+
+    On a miss classify(columns, signature, mapped_sheet) builds the
+    SheetLayout, which is then kept. Returns (layout, known), known being
+    False when the layout had to be built.
+    """
+    layout, known = _lookup(sheet_name, columns, classify)
+    if not known:
+        logger.info(f"{sheet_name}: new sheet layout {layout.signature[:12]} ({len(layout.columns)} columns)")
+    return layout, known
+
+
+def _lookup(sheet_name, columns, classify):
+    """get_layout without the log line"""
+    signature = header_signature(columns)
+    mapped_sheet = mapped_sheet_for(sheet_name, columns)
+    key = (signature, mapped_sheet)
+    with _layouts_lock:
+        layout = _layouts.get(key)
+        if layout is not None:
+            _layouts.move_to_end(key)
+            return layout, True
+
+    layout = classify(list(columns), signature, mapped_sheet)
+    with _layouts_lock:
+        _layouts[key] = layout
+        while len(_layouts) > max(LAYOUT_CACHE_SIZE, len(CONVERTERS)):
+            _layouts.popitem(last=False)
+    return layout, False
+
+
+def seed_layouts(classify):
+    """Compile the layouts of every mapped sheet's standard header row"""
+    compiled = sum(
+        not _lookup(sheet_name, converter.headers, classify)[1] for sheet_name, converter in CONVERTERS.items()
+    )
+    if compiled:
+        logger.info(f"Compiled {compiled} standard sheet layouts")
@@ -0,0 +1,125 @@
+"""
+Process-wide cache of reflected project_* tables
+
+The dynamic importer used to reflect its target table on every import,
+which costs several information_schema queries per sheet on MySQL. Tables
+are now reflected once and kept here until DDL runs in this process or
+the Alembic revision of the database changes. The revision is read at
+most once per SCHEMA_CHECK_TTL seconds; migrations run in this process
+invalidate the cache straight away.
+"""
+
+import logging
+import os
+import threading
+import time
+
+from sqlalchemy import MetaData, Table, inspect, text
+
+logger = logging.getLogger(__name__)
+
+# Seconds between checks of the database's Alembic revision (0 = every lookup)
+SCHEMA_CHECK_TTL = float(os.getenv("SCHEMA_CHECK_TTL", "60"))
+
+_tables = {}
+_metadata = None
+_revision = None
+_checked_at = None
+_lock = threading.RLock()
+
+
+def _new_metadata():
+    """MetaData holding copies of the tables dynamic tables point their foreign keys at"""
+    from src.models import Base
+
+    metadata = MetaData()
+    for table_name in ('projects', 'users'):
+        Base.metadata.tables[table_name].to_metadata(metadata)
+    return metadata
+
+
+def get_metadata():
+    """Shared MetaData that cached and newly built project_* tables live in"""
+    global _metadata
+    with _lock:
+        if _metadata is None:
+            _metadata = _new_metadata()
+        return _metadata
+
+
+def get_schema_revision(bind):
+    """Current Alembic revision of the database, None if it is not versioned"""
+    try:
+        with bind.connect() as connection:
+            return connection.execute(text("SELECT version_num FROM alembic_version")).scalar()
+    except Exception:
+        return None
+
+
+def _check_revision(bind):
+    """Drop every cached table if a migration ran since they were reflected"""
+    global _revision, _checked_at
+    now = time.monotonic()
+    with _lock:
+        if _checked_at is not None and now - _checked_at < SCHEMA_CHECK_TTL:
+            return
+
+    revision = get_schema_revision(bind)
+    with _lock:
+        _checked_at = now
+        if revision != _revision:
+            if _tables:
+                logger.info(f"Schema revision changed ({_revision} -> {revision}), clearing table cache")
+            _clear()
+            _revision = revision
+
+
+def _clear():
+    global _metadata, _checked_at
+    _tables.clear()
+    _metadata = None
+    # Read the revision again on the next lookup
+    _checked_at = None
+
+
+def get_table(bind, table_name):
+    """
+    Get a project table, reflecting it only the first time it is used.
+
+    Returns None if the table does not exist in the database.
+    """
+    _check_revision(bind)
+    with _lock:
+        table = _tables.get(table_name)
+        if table is not None:
+            return table
+
+        if not inspect(bind).has_table(table_name):
+            return None
+
+        metadata = get_metadata()
+        if table_name in metadata.tables:
+            metadata.remove(metadata.tables[table_name])
+        table = Table(table_name, metadata, autoload_with=bind)
+        _tables[table_name] = table
+        return table
+
+
+def create_table(bind, table):
+    """Create a table built in get_metadata() and cache it without reflecting"""
+    with _lock:
+        table.create(bind, checkfirst=True)
+        _tables[table.name] = table
+    return table
+
+
+def invalidate_table_cache(table_name=None):
+    """Forget one cached table, or all of them, after DDL or a migration"""
+    with _lock:
+        if table_name is None:
+            _clear()
+            return
+
+        table = _tables.pop(table_name, None)
+        if table is not None and _metadata is not None:
+            _metadata.remove(table)
@@ -0,0 +1,231 @@
+"""
+Parsed workbook cache shared by the examine, preview and import steps
+
+Each uploaded workbook is opened once and cached by the hash of its
+content, so the xlsx zip and shared strings are not re-parsed for every
+sheet or every action. Entries are evicted least recently used first once
+the cache grows past WORKBOOK_CACHE_MB.
+"""
+
+import hashlib
+import io
+import logging
+import os
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Memory cap for parsed workbooks held in the cache
+WORKBOOK_CACHE_MB = int(os.getenv("WORKBOOK_CACHE_MB", "512"))
+
+# Rows per DataFrame yielded by the streaming reader
+STREAM_CHUNK_ROWS = int(os.getenv("STREAM_CHUNK_ROWS", "5000"))
+
+_cache = OrderedDict()
+_cache_lock = threading.RLock()
+_path_digests = {}
+
+
+class ParsedWorkbook:
+    """An open ExcelFile plus the sheets already parsed from it"""
+
+    def __init__(self, digest, content):
+        self.digest = digest
+        self.excel_file = pd.ExcelFile(io.BytesIO(content))
+        self.sheet_names = self.excel_file.sheet_names
+        self.nbytes = len(content)
+        self._sheets = {}
+        self._headers = {}
+        self._lock = threading.Lock()
+
+    def header(self, sheet_name):
+        """Column names of a sheet, read without parsing its rows"""
+        with self._lock:
+            if sheet_name not in self._headers:
+                if sheet_name in self._sheets:
+                    columns = self._sheets[sheet_name].columns
+                else:
+                    columns = self.excel_file.parse(sheet_name, nrows=0).columns
+                self._headers[sheet_name] = list(columns)
+            return self._headers[sheet_name]
+
+    def sheet(self, sheet_name, usecols=None):
+        """
+        Parse a sheet on first use and return the cached DataFrame.
+
+        With usecols only those columns are parsed; if the whole sheet is
+        already cached, a copy of just those columns is returned from it.
+        The frame is shared between callers, so it must not be modified in
+        place.
+        """
+        if usecols is not None:
+            check_columns(sheet_name, self.header(sheet_name), usecols)
+
+        with self._lock:
+            if sheet_name in self._sheets:
+                df = self._sheets[sheet_name]
+                return df if usecols is None else df[list(usecols)]
+
+            key = (sheet_name, tuple(usecols)) if usecols is not None else sheet_name
+            if key not in self._sheets:
+                df = self.excel_file.parse(sheet_name, usecols=usecols)
+                self._sheets[key] = df
+                self.nbytes += int(df.memory_usage(deep=True).sum())
+            return self._sheets[key]
+
+
+def check_columns(sheet_name, columns, required):
+    """Raise KeyError naming every required header the sheet lacks"""
+    missing = [header for header in required if header not in columns]
+    if missing:
+        raise KeyError(f"{sheet_name} sheet is missing columns: {missing}")
+
+
+def read_content(source):
+    """Read the raw bytes of a path or an uploaded file object"""
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, 'rb') as f:
+            return f.read()
+    if hasattr(source, 'getvalue'):
+        return source.getvalue()
+    position = source.tell()
+    source.seek(0)
+    content = source.read()
+    source.seek(position)
+    return content
+
+
+def _digest_for(source):
+    """Content hash for a source; paths are only re-hashed when they change"""
+    if isinstance(source, (str, os.PathLike)):
+        stat = os.stat(source)
+        key = (os.fspath(source), stat.st_mtime_ns, stat.st_size)
+        if key not in _path_digests:
+            _path_digests[key] = hashlib.sha256(read_content(source)).hexdigest()
+        return _path_digests[key], None
+
+    content = read_content(source)
+    return hashlib.sha256(content).hexdigest(), content
+
+
+def content_digest(source):
+    """SHA-256 of a path or uploaded file, the key workbooks are cached under"""
+    return _digest_for(source)[0]
+
+
+def _trim(keep=None):
+    """Evict least recently used workbooks until the cache fits its memory cap"""
+    limit = WORKBOOK_CACHE_MB * 1024 * 1024
+    while len(_cache) > 1 and sum(wb.nbytes for wb in _cache.values()) > limit:
+        digest = next(iter(_cache))
+        if _cache[digest] is keep:
+            _cache.move_to_end(digest)
+            digest = next(iter(_cache))
+        # Not closed here: another request may still be reading from it
+        _cache.pop(digest)
+        logger.info(f"Evicted workbook {digest[:12]} from cache")
+
+
+def get_workbook(source):
+    """Get the cached parsed workbook for a path or uploaded file"""
+    digest, content = _digest_for(source)
+    with _cache_lock:
+        workbook = _cache.get(digest)
+        if workbook is not None:
+            _cache.move_to_end(digest)
+            return workbook
+
+        if content is None:
+            content = read_content(source)
+        workbook = ParsedWorkbook(digest, content)
+        _cache[digest] = workbook
+        _trim(keep=workbook)
+        return workbook
+
+
+def read_sheet(source, sheet_name, usecols=None):
+    """
+    Read one sheet through the workbook cache.
+
+    source is a path, an uploaded file or a ParsedWorkbook from
+    get_workbook; passing the workbook when reading several sheets of an
+    upload saves re-hashing its content for every sheet. usecols is a list
+    of header names to parse; the header row is checked first and a
+    KeyError raised if any of them is missing.
+    """
+    workbook = source if isinstance(source, ParsedWorkbook) else get_workbook(source)
+    df = workbook.sheet(sheet_name, usecols)
+    with _cache_lock:
+        _trim(keep=workbook)
+    return df
+
+
+def clear_workbook_cache():
+    """Drop every cached workbook"""
+    with _cache_lock:
+        _cache.clear()
+
+
+def _header_names(header):
+    """Column names for a header row, named and de-duplicated like read_excel"""
+    names = []
+    seen = {}
+    for position, value in enumerate(header):
+        name = f"Unnamed: {position}" if value is None else value
+        if name in seen:
+            seen[name] += 1
+            name = f"{name}.{seen[name]}"
+        else:
+            seen[name] = 0
+        names.append(name)
+    return names
+
+
+def iter_sheet_chunks(source, sheet_name, chunk_size=None, usecols=None):
+    """
+    Stream a sheet as DataFrames of at most chunk_size rows.
+
+    Uses openpyxl's read-only mode and bypasses the workbook cache, so
+    memory stays bounded by the chunk size however long the sheet is.
+    With usecols only those columns are kept, and a KeyError is raised
+    before any rows are read if one of them is missing.
+    """
+    from openpyxl import load_workbook
+
+    chunk_size = chunk_size or STREAM_CHUNK_ROWS
+    if not isinstance(source, (str, os.PathLike)):
+        source = io.BytesIO(read_content(source))
+
+    workbook = load_workbook(source, read_only=True, data_only=True)
+    try:
+        rows = workbook[sheet_name].iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+
+        columns = _header_names(header)
+        width = len(columns)
+        positions = None
+        if usecols is not None:
+            check_columns(sheet_name, columns, usecols)
+            positions = [position for position, name in enumerate(columns) if name in usecols]
+            columns = [columns[position] for position in positions]
+
+        chunk = []
+        for row in rows:
+            # Read-only rows can be shorter or longer than the header
+            if len(row) != width:
+                row = (tuple(row) + (None,) * width)[:width]
+            if positions is not None:
+                row = tuple(row[position] for position in positions)
+            chunk.append(row)
+            if len(chunk) >= chunk_size:
+                yield pd.DataFrame.from_records(chunk, columns=columns)
+                chunk = []
+        if chunk:
+            yield pd.DataFrame.from_records(chunk, columns=columns)
+    finally:
+        workbook.close()